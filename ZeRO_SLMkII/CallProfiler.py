@@ -0,0 +1,103 @@
+from timeit import default_timer
+from consts import *
+
+class LatencyHistogram():
+    """Counts call latencies in logarithmic buckets: bucket i holds the calls that
+    took less than 2**i microseconds (and at least 2**(i-1)), the last bucket
+    everything longer. The buckets are allocated once, adding a latency is a
+    bit_length and an increment.
+    """
+
+    def __init__(self, num_buckets = PROFILE_NUM_BUCKETS):
+        self.buckets = [ 0 for x in range(num_buckets) ]
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds):
+        bucket = int(seconds * 1000000.0).bit_length()
+        if bucket >= len(self.buckets):
+            bucket = len(self.buckets) - 1
+        self.buckets[bucket] += 1
+        self.calls += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def percentile(self, percent):
+        """The upper bound (in microseconds) of the bucket the percentile falls into,
+        at most the max latency
+        """
+        limit = self.calls * percent / 100.0
+        count = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            count += bucket_count
+            if count >= limit and count > 0:
+                return min(1 << bucket, int(self.max_seconds * 1000000.0))
+        return 0
+
+    def reset(self):
+        self.buckets = [ 0 for x in self.buckets ]
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+
+class CallProfiler():
+    """Measures how long the callbacks from Live take.
+    wrap() returns a function that calls the given one and adds its latency to the
+    histogram of 'name'. Components replace their methods with the wrapped ones
+    when profiling is enabled, so without profiling there is no overhead at all.
+    The clock is timeit.default_timer, the best clock Python 2.7 offers per platform
+    (the performance counter on Windows).
+    """
+
+    def __init__(self):
+        self.__histograms = {}
+        self.__names = []
+
+    def histogram(self, name):
+        histogram = self.__histograms.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self.__histograms[name] = histogram
+            self.__names.append(name)
+        return histogram
+
+    def wrap(self, name, function):
+        add = self.histogram(name).add
+
+        def profiled(*args):
+            start = default_timer()
+            try:
+                return function(*args)
+            finally:
+                add(default_timer() - start)
+
+        return profiled
+
+    def summary(self):
+        """Returns one line per profiled function with calls, p50, p99, max and total time
+        """
+        lines = []
+        for name in self.__names:
+            histogram = self.__histograms[name]
+            if histogram.calls:
+                lines.append('%s: %d calls, p50 <= %d us, p99 <= %d us, max %d us, total %.1f ms' % (name,
+                 histogram.calls,
+                 histogram.percentile(50),
+                 histogram.percentile(99),
+                 histogram.max_seconds * 1000000.0,
+                 histogram.total_seconds * 1000.0))
+            else:
+                lines.append('%s: no calls' % name)
+        return lines
+
+    def dump(self, log_function, reason):
+        log_function('ZeRO_SLMkII profile (%s):' % reason)
+        for line in self.summary():
+            log_function('  ' + line)
+
+    def reset(self):
+        for histogram in self.__histograms.values():
+            histogram.reset()
@@ -0,0 +1,39 @@
+from consts import *
+
+class CoalescingQueue():
+    """Collects outgoing channel messages between two flushes. Messages are keyed
+    by (status, data1), only the last value per key survives, in the order the
+    keys were first used. So a burst of listener calls within one Live
+    transaction results in one message per touched control.
+    """
+
+    def __init__(self):
+        self.__keys = []
+        self.__messages = {}
+        self.__queued_messages = 0
+        self.__coalesced_messages = 0
+
+    def put(self, midi_bytes, direct = False, lane = None):
+        key = (midi_bytes[0], midi_bytes[1])
+        if key in self.__messages:
+            self.__coalesced_messages += 1
+        else:
+            self.__keys.append(key)
+        self.__messages[key] = (midi_bytes, direct, lane)
+        self.__queued_messages += 1
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def take_all(self):
+        """Returns the (midi_bytes, direct, lane) tuples collected since the last call
+        """
+        messages = self.__messages
+        ret = [ messages[key] for key in self.__keys ]
+        self.__keys = []
+        self.__messages = {}
+        return ret
+
+    def counters(self):
+        return {'queued_messages': self.__queued_messages,
+         'coalesced_messages': self.__coalesced_messages}
@@ -1,6 +1,8 @@
 from RemoteSLComponent import RemoteSLComponent
 from consts import *
-import rtmidi
+from StripAbbreviator import StripAbbreviator
+from SysexEncoder import SysexEncoder
+from DisplayFramebuffer import DisplayFramebuffer
 
 class DisplayController(RemoteSLComponent):
     """Controls the 4 display rows of the RemoteSL.
@@ -16,143 +18,194 @@ class DisplayController(RemoteSLComponent):
         self.__left_strip_parameters = [ None for x in range(NUM_CONTROLS_PER_ROW) ]
         self.__right_strip_names = [ str() for x in range(NUM_CONTROLS_PER_ROW) ]
         self.__right_strip_parameters = [ None for x in range(NUM_CONTROLS_PER_ROW) ]
+        self.__abbreviator = StripAbbreviator()
+        self.__sysex_encoder = SysexEncoder()
+        self.__framebuffer = DisplayFramebuffer()
+        self.__value_strings = {}
+        self.__dirty_value_strips = set()
+        self.__next_value_update_ticks = [ 0 for x in range(NUM_CONTROLS_PER_ROW) ]
+        self.__tick = 0
+        self.__marquee_enabled = DISPLAY_MARQUEE_ENABLED
+        self.__marquee_frames = [ None for x in range(NUM_CONTROLS_PER_ROW) ]
+        self.__marquee_positions = [ 0 for x in range(NUM_CONTROLS_PER_ROW) ]
+        self.__scrolling_strips = []
+        self.__marquee_task = None
         self.refresh_state()
 
-        global mo
-        mo = rtmidi.MidiOut()
-        mo.open_port(0)
-
     def disconnect(self):
+        self.tick_scheduler().cancel(self.__marquee_task)
         self.__send_clear_displays()
 
     def build_midi_map(self, script_handle, midi_map_handle):
         pass
 
+    def framebuffer(self):
+        """The DisplayFramebuffer all components write their display texts to.
+        Changes are sent with the next update_display.
+        """
+        return self.__framebuffer
+
     def setup_left_display(self, names, parameters):
         """Shows the given strings on the upper left row, the parameters values
         in the lower left row.
         
         'names' can be an array of NUM_CONTROLS_PER_ROW strings, or a list with
         exactly one string, which then will fill up the whole display
+        'parameters' can be an array of NUM_CONTROLS_PER_ROW parameters (or None),
+        or a list with exactly one string.
         """
-        self.__left_strip_names = names
-        self.__left_strip_parameters = ["", ] #parameters
+        self.__left_strip_names = list(names)
+        self.__left_strip_parameters = list(parameters)
+        if self.__marquee_enabled and len(names) == NUM_CONTROLS_PER_ROW:
+            self.__setup_marquee(names)
+        else:
+            self.__scrolling_strips = []
+            self.__update_marquee_task()
+            self.__write_strips(DISPLAY_LEFT_UPPER_ROW, self.__left_strip_names)
+        if len(parameters) == NUM_CONTROLS_PER_ROW:
+            self.__dirty_value_strips.update(range(NUM_CONTROLS_PER_ROW))
+        else:
+            self.__dirty_value_strips.clear()
+            self.__framebuffer.write_row(DISPLAY_LEFT_LOWER_ROW, parameters[0])
 
-    def update_display(self):
-        for row_id in (1, 3):
-            message_string = ''
-            if row_id == 1:
-                strip_names = self.__left_strip_names
-                if len(strip_names) == NUM_CONTROLS_PER_ROW:
-                    for s in strip_names:
-                        message_string += self.__generate_strip_string(s)
-                else:
-                    message_string += strip_names[0]
+    def set_left_strip_name(self, strip_index, name):
+        """Shows 'name' in the upper left row of the strip, without touching the
+        other strips (e.g. when the track of the strip was renamed)
+        """
+        if len(self.__left_strip_names) == NUM_CONTROLS_PER_ROW:
+            self.__left_strip_names[strip_index] = name
+            if self.__marquee_enabled:
+                self.__setup_marquee_strip(strip_index, name)
+                self.__scrolling_strips.sort()
+                self.__update_marquee_task()
             else:
-                if row_id == 3:
-                    parameters = self.__left_strip_parameters
-                    if len(parameters) == NUM_CONTROLS_PER_ROW:
-                        for p in parameters:
-                            if p:
-                                message_string += self.__generate_strip_string(unicode(p))
-                            else:
-                                message_string += self.__generate_strip_string('')
-                    else:
-                        message_string += parameters[0]
-            self.__send_display_string(message_string, row_id, offset=0)
+                self.__framebuffer.write_strip(DISPLAY_LEFT_UPPER_ROW, strip_index, self.__abbreviator.strip_string(name))
+
+    def set_marquee_enabled(self, enabled):
+        """Long names in the upper left row scroll through their strip instead of being
+        abbreviated, when the marquee is enabled.
+        """
+        self.__marquee_enabled = enabled
+        self.setup_left_display(self.__left_strip_names, self.__left_strip_parameters)
+
+    def left_strip_parameter_changed(self, strip_index, parameter):
+        """Called by the value listeners of the parameters: shows the value of 'parameter'
+        in the lower left row of the strip. The display is updated with the next ticks,
+        at most every DISPLAY_VALUE_UPDATE_INTERVAL ticks per strip.
+        """
+        if len(self.__left_strip_parameters) == NUM_CONTROLS_PER_ROW:
+            self.__left_strip_parameters[strip_index] = parameter
+            self.__dirty_value_strips.add(strip_index)
+
+    def setup_right_display(self, names, parameters):
+        """Shows the given strings on the upper right row, the parameters values
+        in the lower right row. See setup_left_display
+        """
+        self.__right_strip_names = names
+        self.__right_strip_parameters = parameters
+        self.__write_strips(DISPLAY_RIGHT_UPPER_ROW, self.__right_strip_names)
+        self.__write_strips(DISPLAY_RIGHT_LOWER_ROW, self.__parameter_strings(self.__right_strip_parameters))
+
+    def register_transliteration(self, table):
+        """Registers a {unicode character: replacement} table that is used to show
+        non ASCII characters of track names and parameter values
+        """
+        self.__abbreviator.register_transliteration(table)
+
+    def update_display(self):
+        self.__tick += 1
+        if self.__dirty_value_strips:
+            self.__update_value_strips()
+        for row_id, offset, text in self.__framebuffer.flush():
+            self.__send_display_string(text, row_id, offset)
 
     def refresh_state(self):
-        self.__last_send_row_id_messages = [None,
-         [],
-         [],
-         [],
-         []]
+        self.__framebuffer.invalidate()
+
+    def __setup_marquee(self, names):
+        """All frames of the names are computed here (and cached by the abbreviator),
+        scrolling only has to move on the frame positions.
+        """
+        self.__scrolling_strips = []
+        for strip_index in range(NUM_CONTROLS_PER_ROW):
+            self.__setup_marquee_strip(strip_index, names[strip_index])
+        self.tick_scheduler().cancel(self.__marquee_task)
+        self.__marquee_task = None
+        self.__update_marquee_task()
+
+    def __update_marquee_task(self):
+        """Scrolls every DISPLAY_MARQUEE_INTERVAL ticks, as long as a strip needs to scroll
+        """
+        if self.__scrolling_strips and self.__marquee_task == None:
+            self.__marquee_task = self.tick_scheduler().schedule_repeating(DISPLAY_MARQUEE_INTERVAL, self.__scroll_marquee)
+        elif not self.__scrolling_strips and self.__marquee_task != None:
+            self.__marquee_task.cancel()
+            self.__marquee_task = None
+
+    def __setup_marquee_strip(self, strip_index, name):
+        frames = self.__abbreviator.marquee_frames(name)
+        self.__marquee_frames[strip_index] = frames
+        self.__marquee_positions[strip_index] = 0
+        self.__framebuffer.write_strip(DISPLAY_LEFT_UPPER_ROW, strip_index, frames[0])
+        if strip_index in self.__scrolling_strips:
+            self.__scrolling_strips.remove(strip_index)
+        if len(frames) > 1:
+            self.__scrolling_strips.append(strip_index)
+
+    def __scroll_marquee(self):
+        for strip_index in self.__scrolling_strips:
+            frames = self.__marquee_frames[strip_index]
+            position = (self.__marquee_positions[strip_index] + 1) % len(frames)
+            self.__marquee_positions[strip_index] = position
+            self.__framebuffer.write_strip(DISPLAY_LEFT_UPPER_ROW, strip_index, frames[position])
+
+    def __update_value_strips(self):
+        for strip_index in list(self.__dirty_value_strips):
+            if self.__next_value_update_ticks[strip_index] <= self.__tick:
+                self.__dirty_value_strips.discard(strip_index)
+                self.__next_value_update_ticks[strip_index] = self.__tick + DISPLAY_VALUE_UPDATE_INTERVAL
+                value_string = self.__value_string(self.__left_strip_parameters[strip_index])
+                self.__framebuffer.write_strip(DISPLAY_LEFT_LOWER_ROW, strip_index, value_string)
+
+    def __value_string(self, parameter):
+        """returns the strip string of the parameters current value. The strings are
+        cached per (parameter, value), so going back and forth only formats once.
+        """
+        if parameter == None:
+            return ''
+        key = (parameter, parameter.value)
+        value_string = self.__value_strings.get(key)
+        if value_string is None:
+            if len(self.__value_strings) >= DISPLAY_STRING_CACHE_SIZE:
+                self.__value_strings.clear()
+            value_string = self.__abbreviator.strip_string(unicode(parameter))
+            self.__value_strings[key] = value_string
+        return value_string
+
+    def __parameter_strings(self, parameters):
+        if len(parameters) == NUM_CONTROLS_PER_ROW:
+            return [ p and unicode(p) for p in parameters ]
+        return parameters
+
+    def __write_strips(self, row_id, strings):
+        if len(strings) == NUM_CONTROLS_PER_ROW:
+            self.__framebuffer.write_row(row_id, self.__abbreviator.render_strips(strings))
+        else:
+            self.__framebuffer.write_row(row_id, strings[0])
 
     def __send_clear_displays(self):
-        start_clear_sysex = (240, 0, 32, 41, 3, 3, 18, 0)
-        left_end_sysex = (ABLETON_PID,
-         0,
-         2,
-         2,
-         4,
-         247)
-        right_end_sysex = (ABLETON_PID,
-         0,
-         2,
-         2,
-         5,
-         247)
-        self.send_midi(start_clear_sysex + left_end_sysex)
-        self.send_midi(start_clear_sysex + right_end_sysex)
+        for clear_sysex in self.__sysex_encoder.clear_display_messages():
+            self.send_midi(clear_sysex)
 
     def __send_display_string(self, message, row_id, offset = 0):
-        """Sends a sysex to update a complete row.
+        """Sends a sysex to update a row, starting at the given character.
         
-        'message' must be smaller than NUM_CHARS_PER_DISPLAY_LINE,
-        'offset' can be something form 0 to NUM_CHARS_PER_DISPLAY_LINE - 1
-          (then the text is clipped)
+        'message' is written to the display starting at 'offset', which can be
+          something from 0 to NUM_CHARS_PER_DISPLAY_LINE - 1 (the text is clipped
+          at the end of the row). Characters outside of the message are not touched.
         
         'row_id' is defined as followed: left_row1 = 1 | right_row1 = 2
-           left_row2 = 3] | right_row2 = 4
-        """
-        if row_id in (1, 3):
-            final_message = ' ' * offset + message
-            if len(final_message) < NUM_CHARS_PER_DISPLAY_LINE:
-                fill_up = NUM_CHARS_PER_DISPLAY_LINE - len(final_message)
-                final_message = final_message + ' ' * fill_up
-            elif len(final_message) >= NUM_CHARS_PER_DISPLAY_LINE:
-                final_message = final_message[0:NUM_CHARS_PER_DISPLAY_LINE]
-            final_offset = 0
-            sysex_header = (240,
-             0,
-             32,
-             41,
-             3,
-             3,
-             18,
-             0,
-             ABLETON_PID,
-             0,
-             2,
-             1)
-            sysex_pos = (final_offset, row_id)
-            sysex_text_command = (4,)
-            sysex_text = tuple([ ord(c) for c in final_message ])
-            sysex_close_up = (247,)
-            full_sysex = sysex_header + sysex_pos + sysex_text_command + sysex_text + sysex_close_up
-            mo.send_message(full_sysex)
-            #self.send_midi(full_sysex)
-
-    def __generate_strip_string(self, display_string):
-        """ Hack: Shamelessly stolen from the MainDisplayController of the Mackie Control.
-        Should share this in future in a 'Common' package!
-        
-        returns a 6 char string for of the passed string, trying to remove not so important
-        letters and signs first...
+           left_row2 = 3 | right_row2 = 4
         """
-        if not display_string:
-            return ' ' * NUM_CHARS_PER_DISPLAY_STRIP
-        if len(display_string.strip()) > NUM_CHARS_PER_DISPLAY_STRIP - 1 and display_string.endswith('dB') and display_string.find('.') != -1:
-            display_string = display_string[:-2]
-        if len(display_string) > NUM_CHARS_PER_DISPLAY_STRIP - 1:
-            for um in [' ',
-             'i',
-             'o',
-             'u',
-             'e',
-             'a']:
-                while len(display_string) > NUM_CHARS_PER_DISPLAY_STRIP - 1 and display_string.rfind(um, 1) != -1:
-                    um_pos = display_string.rfind(um, 1)
-                    display_string = display_string[:um_pos] + display_string[um_pos + 1:]
-
-        else:
-            display_string = display_string.center(NUM_CHARS_PER_DISPLAY_STRIP - 1)
-        ret = u''
-        for i in range(NUM_CHARS_PER_DISPLAY_STRIP - 1):
-            if ord(display_string[i]) > 127 or ord(display_string[i]) < 0:
-                ret += ' '
-            else:
-                ret += display_string[i]
-
-        ret += ' '
-        return ret
\ No newline at end of file
+        if row_id in DISPLAY_ROW_IDS:
+            self.send_midi(self.__sysex_encoder.display_string_message(message, row_id, offset), direct=True)
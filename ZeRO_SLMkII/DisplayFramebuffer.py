@@ -0,0 +1,88 @@
+from consts import *
+
+class DisplayFramebuffer():
+    """Models the 4 rows of the two displays of the RemoteSL.
+    Components write text by row and strip, the framebuffer remembers what has
+    been sent to the displays and returns the spans that changed since then.
+
+    'row_id' is defined as followed: left_row1 = 1 | right_row1 = 2
+       left_row2 = 3 | right_row2 = 4
+    """
+
+    def __init__(self):
+        self.__rows = [None] + [ bytearray(' ' * NUM_CHARS_PER_DISPLAY_LINE) for row_id in DISPLAY_ROW_IDS ]
+        self.__sent_rows = [None] + [ None for row_id in DISPLAY_ROW_IDS ]
+        self.__dirty_starts = [None] + [ NUM_CHARS_PER_DISPLAY_LINE for row_id in DISPLAY_ROW_IDS ]
+        self.__dirty_ends = [None] + [ 0 for row_id in DISPLAY_ROW_IDS ]
+
+    def invalidate(self):
+        """Forgets what has been sent, so the next flush updates all rows completely
+        """
+        for row_id in DISPLAY_ROW_IDS:
+            self.__sent_rows[row_id] = None
+            self.__dirty_starts[row_id] = 0
+            self.__dirty_ends[row_id] = NUM_CHARS_PER_DISPLAY_LINE
+
+    def row_text(self, row_id):
+        return str(self.__rows[row_id])
+
+    def write(self, row_id, text, offset = 0):
+        """Writes 'text' into the row 'row_id', starting at the character 'offset'.
+        The text is clipped at the end of the row and must only contain ASCII characters.
+        """
+        if not isinstance(text, str):
+            text = text.encode('ascii', 'replace')
+        end = min(offset + len(text), NUM_CHARS_PER_DISPLAY_LINE)
+        if end <= offset:
+            return
+        row = self.__rows[row_id]
+        row[offset:end] = text[0:end - offset]
+        if offset < self.__dirty_starts[row_id]:
+            self.__dirty_starts[row_id] = offset
+        if end > self.__dirty_ends[row_id]:
+            self.__dirty_ends[row_id] = end
+
+    def write_row(self, row_id, text):
+        """Replaces the whole row, filling it up with blanks
+        """
+        self.write(row_id, text[0:NUM_CHARS_PER_DISPLAY_LINE].ljust(NUM_CHARS_PER_DISPLAY_LINE))
+
+    def write_strip(self, row_id, strip_index, text):
+        """Replaces the text of one strip, filling it up with blanks
+        """
+        self.write(row_id, text[0:NUM_CHARS_PER_DISPLAY_STRIP].ljust(NUM_CHARS_PER_DISPLAY_STRIP), strip_index * NUM_CHARS_PER_DISPLAY_STRIP)
+
+    def flush(self):
+        """Returns a list of (row_id, offset, text) spans that have to be sent to bring
+        the displays up to date, and treats them as sent.
+        Only changed characters are sent. Changes that are closer to each other than the
+        size of a sysex header are sent in one span.
+        """
+        spans = []
+        for row_id in DISPLAY_ROW_IDS:
+            start = self.__dirty_starts[row_id]
+            end = self.__dirty_ends[row_id]
+            if start >= end:
+                continue
+            row = self.__rows[row_id]
+            sent_row = self.__sent_rows[row_id]
+            if sent_row is None:
+                spans.append((row_id, 0, str(row)))
+                self.__sent_rows[row_id] = bytearray(row)
+            else:
+                span_start = None
+                span_end = None
+                for index in range(start, end):
+                    if row[index] != sent_row[index]:
+                        if span_start is None:
+                            span_start = index
+                        elif index - span_end > DISPLAY_SPAN_MERGE_GAP:
+                            spans.append((row_id, span_start, str(row[span_start:span_end])))
+                            span_start = index
+                        span_end = index + 1
+                if span_start is not None:
+                    spans.append((row_id, span_start, str(row[span_start:span_end])))
+                    sent_row[start:end] = row[start:end]
+            self.__dirty_starts[row_id] = NUM_CHARS_PER_DISPLAY_LINE
+            self.__dirty_ends[row_id] = 0
+        return spans
@@ -0,0 +1,149 @@
+from timeit import default_timer
+from consts import *
+from CallProfiler import LatencyHistogram
+from TrafficCounters import received_category, TRAFFIC_CATEGORY_NAMES
+
+FEEDBACK_DISPLAY = -1
+FEEDBACK_OTHER = -2
+
+def __create_in_cc_feedback():
+    """For every received CC number the set of feedback keys (see feedback_key) that
+    count as its feedback, None for any message
+    """
+    in_cc_feedback = [ None for cc_no in range(NUM_CC_NO + 1) ]
+    for index in range(NUM_CONTROLS_PER_ROW):
+        in_cc_feedback[mx_slider_row_ccs[index]] = frozenset([FEEDBACK_DISPLAY])
+        in_cc_feedback[fx_encoder_row_ccs[index]] = frozenset([FEEDBACK_DISPLAY, fx_encoder_feedback_ccs[index]])
+        in_cc_feedback[fx_poti_row_ccs[index]] = frozenset([FEEDBACK_DISPLAY])
+        for ccs in (mx_first_button_row_ccs,
+         mx_second_button_row_ccs,
+         fx_upper_button_row_ccs,
+         fx_lower_button_row_ccs):
+            in_cc_feedback[ccs[index]] = frozenset([ccs[index]])
+    for cc_no in ts_ccs:
+        in_cc_feedback[cc_no] = frozenset(ts_feedback_ccs)
+    for cc_no in mx_display_button_ccs:
+        in_cc_feedback[cc_no] = frozenset([FEEDBACK_DISPLAY] + mx_display_button_ccs)
+    return in_cc_feedback
+
+IN_CC_FEEDBACK = __create_in_cc_feedback()
+NOTE_FEEDBACK = frozenset([FEEDBACK_DISPLAY])
+
+def feedback_key(midi_bytes):
+    """The CC number of a sent CC, FEEDBACK_DISPLAY for display sysex and
+    FEEDBACK_OTHER for everything else
+    """
+    if midi_bytes[0] & 240 == CC_STATUS:
+        return midi_bytes[1]
+    elif midi_bytes[0] == 240 and len(midi_bytes) > SYSEX_COMMAND_POS and midi_bytes[SYSEX_COMMAND_POS] == SYSEX_DISPLAY_COMMAND:
+        return FEEDBACK_DISPLAY
+    return FEEDBACK_OTHER
+
+
+def input_feedback(midi_bytes):
+    """The feedback keys of the messages that count as feedback of the received
+    message: the LED of the same button, the display for sliders, poties and page
+    buttons, the transport LEDs for the transport buttons. None for any message.
+    """
+    status = midi_bytes[0] & 240
+    if status == CC_STATUS:
+        return IN_CC_FEEDBACK[midi_bytes[1]]
+    elif status == NOTE_ON_STATUS or status == NOTE_OFF_STATUS:
+        return NOTE_FEEDBACK
+    return None
+
+
+class FeedbackTracer():
+    """Measures the time from a received message to the first message the script
+    sends in response (e.g. from pressing a mute button to the LED changing),
+    per control type (the input categories of TrafficCounters).
+
+    Only messages that belong to the control of the input count as its feedback
+    (see input_feedback). An input is linked to the first of them sent while it
+    is handled (the call chain of receive_midi, 'immediate'), otherwise to the
+    first of them sent in the next tick ('next tick'), e.g. a display value.
+    Inputs without feedback in both are counted as without feedback (button
+    releases, forwarded controls of empty strips).
+    """
+
+    def __init__(self):
+        num_categories = len(TRAFFIC_CATEGORY_NAMES)
+        self.__histograms = [ LatencyHistogram() for x in range(num_categories) ]
+        self.__immediate = [ 0 for x in range(num_categories) ]
+        self.__next_tick = [ 0 for x in range(num_categories) ]
+        self.__without_feedback = [ 0 for x in range(num_categories) ]
+        self.__input = None
+        self.__waiting_inputs = []
+        self.__in_tick = False
+
+    def wrap_receive_midi(self, receive_midi):
+
+        def traced_receive_midi(midi_bytes):
+            self.__input = (received_category(midi_bytes), default_timer(), input_feedback(midi_bytes))
+            try:
+                receive_midi(midi_bytes)
+            finally:
+                if self.__input is not None:
+                    self.__waiting_inputs.append(self.__input)
+                    self.__input = None
+
+        return traced_receive_midi
+
+    def wrap_update_display(self, update_display):
+
+        def traced_update_display():
+            self.__in_tick = True
+            try:
+                update_display()
+            finally:
+                self.__in_tick = False
+                for category, timestamp, feedback in self.__waiting_inputs:
+                    self.__without_feedback[category] += 1
+                self.__waiting_inputs = []
+
+        return traced_update_display
+
+    def message_sent(self, midi_bytes):
+        """Called by the transport for every message that is sent
+        """
+        if self.__input is not None:
+            category, timestamp, feedback = self.__input
+            if feedback is None or feedback_key(midi_bytes) in feedback:
+                self.__input = None
+                self.__immediate[category] += 1
+                self.__histograms[category].add(default_timer() - timestamp)
+        elif self.__in_tick and self.__waiting_inputs:
+            now = default_timer()
+            key = feedback_key(midi_bytes)
+            waiting_inputs = []
+            for waiting_input in self.__waiting_inputs:
+                category, timestamp, feedback = waiting_input
+                if feedback is None or key in feedback:
+                    self.__next_tick[category] += 1
+                    self.__histograms[category].add(now - timestamp)
+                else:
+                    waiting_inputs.append(waiting_input)
+            self.__waiting_inputs = waiting_inputs
+
+    def summary(self):
+        """Returns one line per control type that was used
+        """
+        lines = []
+        for category, name in enumerate(TRAFFIC_CATEGORY_NAMES):
+            histogram = self.__histograms[category]
+            num_inputs = histogram.calls + self.__without_feedback[category]
+            if num_inputs:
+                lines.append('%s: %d inputs, %d immediate, %d next tick, %d without feedback, p50 <= %d us, p99 <= %d us, max %d us' % (name[3:],
+                 num_inputs,
+                 self.__immediate[category],
+                 self.__next_tick[category],
+                 self.__without_feedback[category],
+                 histogram.percentile(50),
+                 histogram.percentile(99),
+                 histogram.max_seconds * 1000000.0))
+        return lines
+
+    def dump(self, log_function, reason):
+        log_function('ZeRO_SLMkII input to feedback latency (%s):' % reason)
+        for line in self.summary():
+            log_function('  ' + line)
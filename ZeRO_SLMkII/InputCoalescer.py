@@ -0,0 +1,94 @@
+from consts import *
+
+CONTINUOUS_CC_MODES = [ None for cc_no in range(NUM_CC_NO + 1) ]
+for cc_no in mx_slider_row_ccs + fx_poti_row_ccs:
+    CONTINUOUS_CC_MODES[cc_no] = INPUT_MODE_ABSOLUTE
+for cc_no in fx_encoder_row_ccs:
+    CONTINUOUS_CC_MODES[cc_no] = INPUT_MODE_RELATIVE
+
+def decode_relative(cc_value):
+    """Decodes the signed bit format of the encoders (bit 6 is the sign)"""
+    if cc_value & 64:
+        return -(cc_value & 63)
+    return cc_value & 63
+
+def encode_relative(delta):
+    if delta < 0:
+        return 64 | min(-delta, 63)
+    return min(delta, 63)
+
+
+class InputCoalescer():
+    """Collects the CCs of continuous controls (sliders, poties, encoders) that are
+    handled by the script and calls their handlers once per tick, with the latest
+    value only. Relative encoder moves are summed up instead.
+
+    Absolute values are filtered: a change smaller than 'deadband' is ignored, and
+    when the control changes its direction, the change must be at least
+    'jitter_threshold' (so a control flickering between two values is quiet).
+    The end values 0 and 127 always pass.
+    """
+
+    def __init__(self, deadband = INPUT_DEADBAND, jitter_threshold = INPUT_JITTER_THRESHOLD):
+        self.__deadband = deadband
+        self.__jitter_threshold = jitter_threshold
+        self.__keys = []
+        self.__pending = {}
+        self.__last_values = {}
+        self.__last_directions = {}
+        self.__received_messages = 0
+        self.__delivered_messages = 0
+
+    def put(self, channel, cc_no, cc_value, handler):
+        """Queues the value of the control, 'handler' is the (handler, argument) entry
+        of the dispatch table that gets the value on flush.
+        """
+        key = (channel, cc_no)
+        pending = self.__pending.get(key)
+        if pending is None:
+            self.__keys.append(key)
+        elif CONTINUOUS_CC_MODES[cc_no] == INPUT_MODE_RELATIVE:
+            cc_value = encode_relative(decode_relative(pending[0]) + decode_relative(cc_value))
+        self.__pending[key] = (cc_value, handler)
+        self.__received_messages += 1
+
+    def flush(self):
+        """Calls the handlers of all controls that moved since the last flush
+        """
+        if not self.__keys:
+            return
+        keys = self.__keys
+        pending = self.__pending
+        self.__keys = []
+        self.__pending = {}
+        for key in keys:
+            cc_value, handler = pending[key]
+            if CONTINUOUS_CC_MODES[key[1]] == INPUT_MODE_ABSOLUTE and not self.__passes_filter(key, cc_value):
+                continue
+            self.__delivered_messages += 1
+            handler[0](handler[1], cc_value)
+
+    def reset(self):
+        """Forgets the last values, e.g. when the strips got other tracks
+        """
+        self.__last_values.clear()
+        self.__last_directions.clear()
+
+    def counters(self):
+        return {'received_messages': self.__received_messages,
+         'delivered_messages': self.__delivered_messages}
+
+    def __passes_filter(self, key, cc_value):
+        last_value = self.__last_values.get(key)
+        if last_value is not None and cc_value not in (0, NUM_CC_NO):
+            delta = cc_value - last_value
+            if abs(delta) < self.__deadband:
+                return False
+            direction = delta > 0
+            if direction != self.__last_directions.get(key, direction) and abs(delta) < self.__jitter_threshold:
+                return False
+            self.__last_directions[key] = direction
+        elif last_value == cc_value:
+            return False
+        self.__last_values[key] = cc_value
+        return True
@@ -0,0 +1,39 @@
+from consts import *
+
+class LedShadowRegister():
+    """Remembers the last value sent to every LED (status byte, CC number) of the
+    RemoteSL, so LED messages that wouldn't change anything are not sent again.
+    CCs that are commands instead of LED values (see led_command_ccs) always pass,
+    'all LEDs off' forgets all values.
+    """
+
+    def __init__(self):
+        self.__values = {}
+
+    def invalidate(self):
+        """Forgets all values, so the next write of every LED is sent
+        """
+        self.__values.clear()
+
+    def forget(self, midi_bytes):
+        """Forgets the value of the LED of the message (e.g. because it was never
+        sent), so the next write of that LED is sent
+        """
+        if len(midi_bytes) == 3 and midi_bytes[0] & 240 == CC_STATUS:
+            self.__values.pop((midi_bytes[0], midi_bytes[1]), None)
+
+    def should_send(self, midi_bytes):
+        """Returns False for a CC that would set an LED to the value it already has.
+        """
+        if len(midi_bytes) != 3 or midi_bytes[0] & 240 != CC_STATUS:
+            return True
+        cc_no = midi_bytes[1]
+        if cc_no in led_command_ccs:
+            if cc_no == ALL_LEDS_OFF_CC:
+                self.__values.clear()
+            return True
+        key = (midi_bytes[0], cc_no)
+        if self.__values.get(key) == midi_bytes[2]:
+            return False
+        self.__values[key] = midi_bytes[2]
+        return True
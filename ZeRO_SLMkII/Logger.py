@@ -0,0 +1,89 @@
+import time
+from consts import *
+
+LEVEL_NAMES = {LOG_LEVEL_DEBUG: 'DEBUG',
+ LOG_LEVEL_INFO: 'INFO',
+ LOG_LEVEL_WARNING: 'WARNING',
+ LOG_LEVEL_ERROR: 'ERROR'}
+
+class Logger():
+    """Leveled logging to Live's Log.txt (through 'log_function').
+
+    Hot path events are not formatted nor written: trace() stores them in a fixed
+    size ring buffer, which is only formatted and written by dump(). Tracing is
+    enabled with the debug level; check 'tracing' before calling trace() so
+    disabled tracing costs one attribute lookup.
+    sampled() writes only the first and then every LOG_SAMPLE_INTERVAL-th message
+    per key, for messages that can repeat at MIDI rate.
+    """
+
+    def __init__(self, log_function, level = LOG_LEVEL, ring_buffer_size = LOG_RING_BUFFER_SIZE):
+        self.__log_function = log_function
+        self.__ring_buffer = [ None for x in range(ring_buffer_size) ]
+        self.__ring_buffer_pos = 0
+        self.__sample_counts = {}
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.__level = level
+        self.tracing = level <= LOG_LEVEL_DEBUG
+
+    def level(self):
+        return self.__level
+
+    def trace(self, event, data = None):
+        """Stores the event in the ring buffer, without formatting it
+        """
+        pos = self.__ring_buffer_pos
+        self.__ring_buffer[pos] = (time.time(), event, data)
+        pos += 1
+        if pos == len(self.__ring_buffer):
+            pos = 0
+        self.__ring_buffer_pos = pos
+
+    def dump(self, reason):
+        """Writes the ring buffer to the log, oldest event first, and empties it
+        """
+        buffer = self.__ring_buffer
+        pos = self.__ring_buffer_pos
+        entries = [ entry for entry in buffer[pos:] + buffer[:pos] if entry is not None ]
+        if entries:
+            self.__log_function('ZeRO_SLMkII trace (%s), %d events:' % (reason, len(entries)))
+            for timestamp, event, data in entries:
+                if data is None:
+                    self.__log_function('  %.3f %s' % (timestamp, event))
+                else:
+                    self.__log_function('  %.3f %s %s' % (timestamp, event, str(data)))
+        self.__ring_buffer = [ None for x in buffer ]
+        self.__ring_buffer_pos = 0
+
+    def log(self, level, message, *args):
+        if level >= self.__level:
+            if args:
+                message = message % args
+            self.__log_function('%s: %s' % (LEVEL_NAMES.get(level, str(level)), message))
+
+    def debug(self, message, *args):
+        self.log(LOG_LEVEL_DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(LOG_LEVEL_INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(LOG_LEVEL_WARNING, message, *args)
+
+    def error(self, message, *args):
+        self.log(LOG_LEVEL_ERROR, message, *args)
+
+    def sampled(self, level, key, message, *args):
+        """Logs the first message of 'key' and then every LOG_SAMPLE_INTERVAL-th one,
+        with the number of messages since the last one that was logged.
+        """
+        if level < self.__level:
+            return
+        count = self.__sample_counts.get(key, 0)
+        self.__sample_counts[key] = count + 1
+        if count == 0:
+            self.log(level, message, *args)
+        elif count % LOG_SAMPLE_INTERVAL == 0:
+            self.log(level, message + ' (%d times)', *(args + (LOG_SAMPLE_INTERVAL,)))
@@ -0,0 +1,82 @@
+import struct
+import time
+from timeit import default_timer
+from consts import *
+
+CAPTURE_MAGIC = 'ZSLC'
+CAPTURE_VERSION = 1
+CAPTURE_DIRECTION_IN = 0
+CAPTURE_DIRECTION_OUT = 1
+CAPTURE_DIRECTION_OUT_DIRECT = 2
+CAPTURE_DIRECTION_TICK = 3
+
+CAPTURE_HEADER = struct.Struct('<4sBd')
+CAPTURE_RECORD = struct.Struct('<IBH')
+MAX_RECORD_DELAY = 4294967295L
+
+class MidiCapture():
+    """Records MIDI messages with their direction and time into a binary file,
+    which can be replayed with read_capture (see benchmarks/replay_capture.py).
+
+    The file starts with CAPTURE_HEADER (magic, version, start time), followed by
+    one CAPTURE_RECORD per event: the microseconds since the previous event, the
+    direction and the number of message bytes, followed by the bytes. Timer ticks
+    (update_display) are recorded without bytes.
+    The delays are measured with timeit.default_timer, like everywhere else in the
+    script, only the start time in the header is the wall clock time. Records are
+    buffered and written in blocks of 'buffer_size' bytes.
+    """
+
+    def __init__(self, file_name, buffer_size = MIDI_CAPTURE_BUFFER_SIZE):
+        self.__file = open(file_name, 'wb')
+        self.__buffer_size = buffer_size
+        self.__buffer = bytearray()
+        self.__last_time = default_timer()
+        self.__recorded_events = 0
+        self.__file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+
+    def record(self, direction, midi_bytes = ()):
+        now = default_timer()
+        delay = max(0, int((now - self.__last_time) * 1000000.0))
+        self.__last_time = now
+        buffer = self.__buffer
+        buffer += CAPTURE_RECORD.pack(min(delay, MAX_RECORD_DELAY), direction, len(midi_bytes))
+        buffer += bytearray(midi_bytes)
+        self.__recorded_events += 1
+        if len(buffer) >= self.__buffer_size:
+            self.__write_buffer()
+
+    def close(self):
+        if self.__file is not None:
+            self.__write_buffer()
+            self.__file.close()
+            self.__file = None
+
+    def recorded_events(self):
+        return self.__recorded_events
+
+    def __write_buffer(self):
+        self.__file.write(self.__buffer)
+        self.__buffer = bytearray()
+
+
+def read_capture(file_name):
+    """Returns the start time and a list of (seconds since start, direction, midi_bytes)
+    of the capture file. A record cut off at the end (e.g. Live crashed) is ignored.
+    """
+    data = open(file_name, 'rb').read()
+    magic, version, start_time = CAPTURE_HEADER.unpack_from(data, 0)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError('%s is not a ZeRO_SLMkII capture file' % file_name)
+    events = []
+    seconds = 0.0
+    pos = CAPTURE_HEADER.size
+    while pos + CAPTURE_RECORD.size <= len(data):
+        delay, direction, length = CAPTURE_RECORD.unpack_from(data, pos)
+        pos += CAPTURE_RECORD.size
+        if pos + length > len(data):
+            break
+        seconds += delay / 1000000.0
+        events.append((seconds, direction, tuple(bytearray(data[pos:pos + length]))))
+        pos += length
+    return start_time, events
@@ -0,0 +1,229 @@
+from collections import deque
+import threading
+from consts import *
+from MidiCapture import CAPTURE_DIRECTION_OUT, CAPTURE_DIRECTION_OUT_DIRECT
+
+class LiveMidiBackend():
+    """Sends through Live to the MIDI ports the script is assigned to
+    """
+
+    def __init__(self, c_instance):
+        self.__c_instance = c_instance
+
+    def send(self, midi_bytes):
+        self.__c_instance.send_midi(midi_bytes)
+
+    def close(self):
+        pass
+
+    def counters(self):
+        return {}
+
+
+class RtMidiBackend():
+    """Sends directly to an rtmidi output port. The port is opened with the first
+    message, so no OS MIDI handle is used as long as nothing is sent.
+    """
+
+    def __init__(self, port = RTMIDI_OUTPUT_PORT):
+        self.__port = port
+        self.__midi_out = None
+
+    def send(self, midi_bytes):
+        if self.__midi_out is None:
+            self.__open()
+        self.__midi_out.send_message(midi_bytes)
+
+    def close(self):
+        if self.__midi_out is not None:
+            self.__midi_out.close_port()
+            self.__midi_out = None
+
+    def counters(self):
+        return {}
+
+    def __open(self):
+        import rtmidi
+        self.__midi_out = rtmidi.MidiOut()
+        self.__midi_out.open_port(self.__port)
+
+
+class NullMidiBackend():
+    """Throws all messages away
+    """
+
+    def send(self, midi_bytes):
+        pass
+
+    def close(self):
+        pass
+
+    def counters(self):
+        return {}
+
+
+class RecordingMidiBackend():
+    """Keeps all sent messages in 'messages', for tests and benchmarks
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, midi_bytes):
+        self.messages.append(tuple(midi_bytes))
+
+    def close(self):
+        pass
+
+    def counters(self):
+        return {}
+
+
+class ThreadedMidiBackend():
+    """Hands the messages over to a writer thread, which sends them through the
+    wrapped backend in the order they were queued. So a blocking MIDI driver
+    doesn't block Live's script thread.
+    The queue holds at most 'max_queued_messages', the oldest message is dropped
+    when it is full and passed to the dropped message listener (like the output
+    scheduler does), so its sender can send the state again.
+    close() lets the writer send everything that is queued (e.g. the display
+    clears and the good bye sysex), the writer closes the wrapped backend when it
+    is done. So a writer that is still sending after the close timeout never
+    finds its backend closed.
+    """
+
+    def __init__(self, backend, max_queued_messages = MIDI_WRITER_MAX_QUEUED_MESSAGES):
+        self.__backend = backend
+        self.__max_queued_messages = max_queued_messages
+        self.__queue = deque()
+        self.__wakeup = threading.Event()
+        self.__closing = False
+        self.__thread = None
+        self.__written_messages = 0
+        self.__dropped_messages = 0
+        self.__failed_messages = 0
+        self.__max_queue_depth = 0
+        self.__dropped_message_listener = None
+
+    def set_dropped_message_listener(self, listener):
+        self.__dropped_message_listener = listener
+
+    def send(self, midi_bytes):
+        if self.__thread is None:
+            self.__start()
+        queue = self.__queue
+        if len(queue) >= self.__max_queued_messages:
+            dropped_midi_bytes = queue.popleft()
+            self.__dropped_messages += 1
+            if self.__dropped_message_listener is not None:
+                self.__dropped_message_listener(dropped_midi_bytes)
+        queue.append(midi_bytes)
+        if len(queue) > self.__max_queue_depth:
+            self.__max_queue_depth = len(queue)
+        self.__wakeup.set()
+
+    def close(self):
+        if self.__thread is None:
+            self.__backend.close()
+        else:
+            self.__closing = True
+            self.__wakeup.set()
+            self.__thread.join(MIDI_WRITER_CLOSE_TIMEOUT)
+            self.__thread = None
+
+    def counters(self):
+        return {'writer_queue_depth': len(self.__queue),
+         'writer_max_queue_depth': self.__max_queue_depth,
+         'writer_written_messages': self.__written_messages,
+         'writer_dropped_messages': self.__dropped_messages,
+         'writer_failed_messages': self.__failed_messages}
+
+    def __start(self):
+        self.__closing = False
+        self.__thread = threading.Thread(target=self.__run, name='ZeRO_SLMkII MIDI writer')
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __run(self):
+        queue = self.__queue
+        while True:
+            self.__wakeup.wait()
+            self.__wakeup.clear()
+            while queue:
+                try:
+                    self.__backend.send(queue.popleft())
+                    self.__written_messages += 1
+                except Exception:
+                    self.__failed_messages += 1
+            if self.__closing:
+                self.__backend.close()
+                return
+
+
+class MidiTransport():
+    """The single MIDI output of the script, shared by all components.
+    Messages go to the main backend (normally Live), or with send_direct to the
+    direct backend (normally rtmidi), which falls back to the main backend when
+    there is none.
+    While a MidiCapture is set, all sent messages are recorded in it. All sent
+    messages are also counted in the TrafficCounters and passed to the
+    FeedbackTracer, if these are set. 'lane' is the output scheduler lane the
+    message was sent from, if any.
+    """
+
+    def __init__(self, backend, direct_backend = None):
+        self.__backend = backend
+        self.__direct_backend = direct_backend
+        self.__capture = None
+        self.__traffic_counters = None
+        self.__feedback_tracer = None
+
+    def set_capture(self, capture):
+        self.__capture = capture
+
+    def set_traffic_counters(self, traffic_counters):
+        self.__traffic_counters = traffic_counters
+
+    def set_feedback_tracer(self, feedback_tracer):
+        self.__feedback_tracer = feedback_tracer
+
+    def set_backend(self, backend):
+        self.__backend.close()
+        self.__backend = backend
+
+    def set_direct_backend(self, direct_backend):
+        if self.__direct_backend is not None:
+            self.__direct_backend.close()
+        self.__direct_backend = direct_backend
+
+    def send(self, midi_bytes, lane = None):
+        if self.__capture is not None:
+            self.__capture.record(CAPTURE_DIRECTION_OUT, midi_bytes)
+        if self.__traffic_counters is not None:
+            self.__traffic_counters.count_sent(midi_bytes, lane)
+        if self.__feedback_tracer is not None:
+            self.__feedback_tracer.message_sent(midi_bytes)
+        self.__backend.send(midi_bytes)
+
+    def send_direct(self, midi_bytes, lane = None):
+        if self.__capture is not None:
+            self.__capture.record(CAPTURE_DIRECTION_OUT_DIRECT, midi_bytes)
+        if self.__traffic_counters is not None:
+            self.__traffic_counters.count_sent(midi_bytes, lane)
+        if self.__feedback_tracer is not None:
+            self.__feedback_tracer.message_sent(midi_bytes)
+        if self.__direct_backend is not None:
+            self.__direct_backend.send(midi_bytes)
+        else:
+            self.__backend.send(midi_bytes)
+
+    def close(self):
+        self.__backend.close()
+        if self.__direct_backend is not None:
+            self.__direct_backend.close()
+
+    def counters(self):
+        counters = dict(self.__backend.counters())
+        if self.__direct_backend is not None:
+            counters.update(self.__direct_backend.counters())
+        return counters
@@ -1,8 +1,9 @@
 import Live
 import os
 from RemoteSLComponent import RemoteSLComponent
+from TrackIndex import TrackIndex
+from TrackStateIndex import TrackStateIndex
 from consts import *
-import rtmidi
 
 class MixerController(RemoteSLComponent):
     """Represents the 'right side' of the RemoteSL:
@@ -15,84 +16,117 @@ class MixerController(RemoteSLComponent):
         RemoteSLComponent.__init__(self, remote_sl_parent)
         self.__display_controller = display_controller
         self.__parent = remote_sl_parent
-        self.__forward_button_down = False
-        self.__rewind_button_down = False
+        self.__forward_task = None
+        self.__rewind_task = None
         self.__c_instance = c_instance
         self.__strip_offset = 0
         self.__blink = 0
+        self.__blinking_strips = set()
+        self.__blink_task = None
+        self.__track_index = TrackIndex(self.song())
+        self.__track_state_index = TrackStateIndex(self.song())
         self.__strips = [ MixerChannelStrip(self, i) for i in range(NUM_CONTROLS_PER_ROW) ]
-        self.__assigned_tracks = []
+        self.__build_dispatch_tables()
         self.__transport_locked = False
-        self.__lock_enquiry_delay = 0
+        self.__midi_map_plan = None
+        self.__lock_enquiry_task = None
         self.song().add_visible_tracks_listener(self.__on_tracks_added_or_deleted)
+        self.song().add_return_tracks_listener(self.__on_return_tracks_added_or_deleted)
         self.song().add_record_mode_listener(self.__on_record_mode_changed)
         self.song().add_is_playing_listener(self.__on_is_playing_changed)
         self.song().add_loop_listener(self.__on_loop_changed)
-        self.__reassign_strips()
-
-        global mo
-        mo = rtmidi.MidiOut()
-        mo.open_port(0)
+        self.__reassign_strips(True)
 
     def disconnect(self):
         self.song().remove_visible_tracks_listener(self.__on_tracks_added_or_deleted)
+        self.song().remove_return_tracks_listener(self.__on_return_tracks_added_or_deleted)
         self.song().remove_record_mode_listener(self.__on_record_mode_changed)
         self.song().remove_is_playing_listener(self.__on_is_playing_changed)
         self.song().remove_loop_listener(self.__on_loop_changed)
+        for task in (self.__forward_task, self.__rewind_task, self.__blink_task, self.__lock_enquiry_task):
+            self.tick_scheduler().cancel(task)
         for strip in self.__strips:
             strip.set_assigned_track(None)
-
-        for track in self.__assigned_tracks:
-            if track and track.name_has_listener(self.__on_track_name_changed):
-                track.remove_name_listener(self.__on_track_name_changed)
+        self.__track_index.disconnect()
+        self.__track_state_index.disconnect()
 
     def remote_sl_parent(self):
         return self.__parent
 
-    def receive_midi_cc(self, cc_no, cc_value):
-        if cc_no in ts_ccs:
-            self.__handle_transport_ccs(cc_no, cc_value)
-        elif cc_no in mx_slider_row_ccs:
-            channel_strip = self.__strips[cc_no - MX_SLIDER_ROW_BASE_CC]
-            channel_strip.slider_moved(cc_value)
-        elif cc_no in mx_first_button_row_ccs:
-            channel_strip = self.__strips[cc_no - MX_FIRST_BUTTON_ROW_BASE_CC]
-            if cc_value == CC_VAL_BUTTON_PRESSED:
-                channel_strip.first_button_pressed()
-        elif cc_no in mx_second_button_row_ccs:
-            channel_strip = self.__strips[cc_no - MX_SECOND_BUTTON_ROW_BASE_CC]
-            if cc_value == CC_VAL_BUTTON_PRESSED:
-                channel_strip.second_button_pressed()
-        elif cc_no in fx_upper_button_row_ccs:
-            channel_strip = self.__strips[cc_no - FX_UPPER_BUTTON_ROW_BASE_CC]
-            if cc_value == CC_VAL_BUTTON_PRESSED:
-                channel_strip.solo_button_pressed()
-        elif cc_no in fx_lower_button_row_ccs:
-            channel_strip = self.__strips[cc_no - FX_LOWER_BUTTON_ROW_BASE_CC]
-            if cc_value == NUM_CC_NO:
-                channel_strip.stop_button_pressed()
-                #channel_strip.select_button_pressed # switch with line above to select track for this button row
-        elif cc_no in mx_display_button_ccs:
-            self.__handle_page_up_down_ccs(cc_no, cc_value)
-        else:
-            print "unknown FX midi message"
-
-    def receive_midi_note(self, note, velocity, note_onoff_status):
-        if note_onoff_status == NOTE_ON_STATUS:
-            if note == CA_METRONOME:
-                self.ca_toggle_metronome()
-            elif note == CA_TAP:
-                self.ca_tap()
-            elif note == CA_SAVE:
-                self.ca_save()
-            elif note == CA_UNDO:
-                self.ca_undo()
-            elif note == CA_ADD_AUDIO_TRACK:
-                self.ca_addMidiTrack()
-            elif note == CA_ADD_RETURN_TRACK:
-                self.ca_addReturnTrack()
-            elif note == CA_ADD_MIDI_TRACK:
-                self.ca_addMidiTrack()
+    def track_index(self):
+        return self.__track_index
+
+    def set_profiler(self, profiler):
+        self.__reassign_strips = profiler.wrap('reassign_strips', self.__reassign_strips)
+
+    def cc_handlers(self):
+        """The CC dispatch table: one (handler, argument) entry per CC number, or None
+        for CCs that are not handled. Handlers are called with (argument, cc_value).
+        """
+        return self.__cc_handlers
+
+    def note_on_handlers(self):
+        """The note on dispatch table, see cc_handlers
+        """
+        return self.__note_on_handlers
+
+    def __build_dispatch_tables(self):
+        """Compiles the CC and note maps of consts into tables with an entry for each of
+        the 128 CC/note numbers, so routing an incoming message is one index lookup.
+        """
+        self.__cc_handlers = [ None for cc_no in range(NUM_CC_NO + 1) ]
+        for strip_index in range(NUM_CONTROLS_PER_ROW):
+            self.__cc_handlers[mx_slider_row_ccs[strip_index]] = (self.__on_slider_cc, strip_index)
+            self.__cc_handlers[fx_encoder_row_ccs[strip_index]] = (self.__on_encoder_cc, strip_index)
+            self.__cc_handlers[fx_poti_row_ccs[strip_index]] = (self.__on_potie_cc, strip_index)
+            self.__cc_handlers[mx_first_button_row_ccs[strip_index]] = (self.__on_first_button_cc, strip_index)
+            self.__cc_handlers[mx_second_button_row_ccs[strip_index]] = (self.__on_second_button_cc, strip_index)
+            self.__cc_handlers[fx_upper_button_row_ccs[strip_index]] = (self.__on_solo_button_cc, strip_index)
+            self.__cc_handlers[fx_lower_button_row_ccs[strip_index]] = (self.__on_stop_button_cc, strip_index)
+        for cc_no in ts_ccs:
+            self.__cc_handlers[cc_no] = (self.__handle_transport_ccs, cc_no)
+        for cc_no in mx_display_button_ccs:
+            self.__cc_handlers[cc_no] = (self.__handle_page_up_down_ccs, cc_no)
+
+        self.__note_on_handlers = [ None for note in range(NUM_CC_NO + 1) ]
+        for note, action in ((CA_METRONOME, self.ca_toggle_metronome),
+         (CA_TAP, self.ca_tap),
+         (CA_SAVE, self.ca_save),
+         (CA_UNDO, self.ca_undo),
+         (CA_ADD_AUDIO_TRACK, self.ca_addMidiTrack),
+         (CA_ADD_RETURN_TRACK, self.ca_addReturnTrack),
+         (CA_CLEAR_SOLOS_AND_ARMS, self.ca_clearSolosAndArms),
+         (CA_ADD_MIDI_TRACK, self.ca_addMidiTrack)):
+            self.__note_on_handlers[note] = (self.__on_custom_action_note, action)
+
+    def __on_slider_cc(self, strip_index, cc_value):
+        self.__strips[strip_index].slider_moved(cc_value)
+
+    def __on_encoder_cc(self, strip_index, cc_value):
+        self.__strips[strip_index].encoder_moved(cc_value)
+
+    def __on_potie_cc(self, strip_index, cc_value):
+        self.__strips[strip_index].potie_moved(cc_value)
+
+    def __on_first_button_cc(self, strip_index, cc_value):
+        if cc_value == CC_VAL_BUTTON_PRESSED:
+            self.__strips[strip_index].first_button_pressed()
+
+    def __on_second_button_cc(self, strip_index, cc_value):
+        if cc_value == CC_VAL_BUTTON_PRESSED:
+            self.__strips[strip_index].second_button_pressed()
+
+    def __on_solo_button_cc(self, strip_index, cc_value):
+        if cc_value == CC_VAL_BUTTON_PRESSED:
+            self.__strips[strip_index].solo_button_pressed()
+
+    def __on_stop_button_cc(self, strip_index, cc_value):
+        if cc_value == NUM_CC_NO:
+            self.__strips[strip_index].stop_button_pressed()
+            #self.__strips[strip_index].select_button_pressed() # switch with line above to select track for this button row
+
+    def __on_custom_action_note(self, action, velocity):
+        action()
 
     def ca_toggle_metronome(self):
         if (self.song().metronome == 1):
@@ -122,38 +156,51 @@ class MixerController(RemoteSLComponent):
     def ca_addMidiTrack(self):
         self.song().create_midi_track(-1)
 
+    def ca_clearSolosAndArms(self):
+        self.ca_clearAllSolos()
+        self.ca_disarmAll()
+
+    def ca_clearAllSolos(self):
+        for track in self.__track_state_index.soloed_tracks():
+            track.solo = False
+
+    def ca_disarmAll(self):
+        for track in self.__track_state_index.armed_tracks():
+            track.arm = False
+
     def build_midi_map(self, script_handle, midi_map_handle):
         needs_takeover = True
-        for s in self.__strips:
+        for strip_index, s in enumerate(self.__strips):
+            slider_parameter, encoder_parameter, potie_parameter = s.mapped_parameters()
             # Attach sliders
-            cc_no = MX_SLIDER_ROW_BASE_CC + self.__strips.index(s)
-            if s.assigned_track() and s.slider_parameter():
+            cc_no = MX_SLIDER_ROW_BASE_CC + strip_index
+            if slider_parameter != None:
                 map_mode = Live.MidiMap.MapMode.absolute
-                parameter = s.slider_parameter()
+                parameter = slider_parameter
                 Live.MidiMap.map_midi_cc(midi_map_handle, parameter, SL_MIDI_CHANNEL, cc_no, map_mode, not needs_takeover)
             else:
                 Live.MidiMap.forward_midi_cc(script_handle, midi_map_handle, SL_MIDI_CHANNEL, cc_no)
             # Attach encoders
-            cc_no = FX_ENCODER_ROW_BASE_CC + self.__strips.index(s)
-            if s.assigned_track() and s.encoder_parameter():
+            cc_no = FX_ENCODER_ROW_BASE_CC + strip_index
+            if encoder_parameter != None:
                 map_mode = Live.MidiMap.MapMode.relative_smooth_signed_bit
-                parameter = s.encoder_parameter()
+                parameter = encoder_parameter
                 feedback_rule = Live.MidiMap.CCFeedbackRule()
-                feedback_rule.cc_no = fx_encoder_feedback_ccs[self.__strips.index(s)]
+                feedback_rule.cc_no = fx_encoder_feedback_ccs[strip_index]
                 feedback_rule.channel = SL_MIDI_CHANNEL
                 feedback_rule.delay_in_ms = 0
-                feedback_rule.cc_value_map = tuple([ int(1.5 + float(index) / 127.0 * 10.0) for index in range(128) ])
+                feedback_rule.cc_value_map = fx_encoder_feedback_cc_value_map
                 ring_mode_value = FX_RING_VOL_VALUE
-                self.send_midi((self.cc_status_byte(), fx_encoder_led_mode_ccs[self.__strips.index(s)], ring_mode_value))
+                self.send_midi((self.cc_status_byte(), fx_encoder_led_mode_ccs[strip_index], ring_mode_value))
                 Live.MidiMap.map_midi_cc_with_feedback_map(midi_map_handle, parameter, SL_MIDI_CHANNEL, cc_no, map_mode, feedback_rule, not needs_takeover)
                 Live.MidiMap.send_feedback_for_parameter(midi_map_handle, parameter)
             else:
                 Live.MidiMap.forward_midi_cc(script_handle, midi_map_handle, SL_MIDI_CHANNEL, cc_no)
             # Attach poties
-            cc_no = FX_POTI_ROW_BASE_CC + self.__strips.index(s)
-            if s.assigned_track() and s.potie_parameter():
+            cc_no = FX_POTI_ROW_BASE_CC + strip_index
+            if potie_parameter != None:
                 map_mode = Live.MidiMap.MapMode.absolute
-                parameter = s.potie_parameter()
+                parameter = potie_parameter
                 Live.MidiMap.map_midi_cc(midi_map_handle, parameter, SL_MIDI_CHANNEL, cc_no, map_mode, not needs_takeover)
             else:
                 Live.MidiMap.forward_midi_cc(script_handle, midi_map_handle, SL_MIDI_CHANNEL, cc_no)
@@ -164,66 +211,86 @@ class MixerController(RemoteSLComponent):
         for note in fx_drum_pad_row_notes:
             Live.MidiMap.forward_midi_note(script_handle, midi_map_handle, SL_MIDI_CHANNEL, note)
 
+        self.__midi_map_plan = self.__create_midi_map_plan()
+
+    def __create_midi_map_plan(self):
+        """The parameters the sliders, encoders and poties are mapped to (by '_live_ptr').
+        The map modes and the forwarded controls are fixed, so an equal plan means an
+        equal MIDI map.
+        """
+        return tuple([ tuple([ p and p._live_ptr for p in s.mapped_parameters() ]) for s in self.__strips ])
+
+    def __request_rebuild_midi_map_if_changed(self):
+        """Requests a rebuild only when the plan differs from the one in effect (or
+        already requested). Rebuilds are expensive and make the controls drop out shortly.
+        """
+        plan = self.__create_midi_map_plan()
+        if plan != self.__midi_map_plan:
+            self.__midi_map_plan = plan
+            self.request_rebuild_midi_map()
+
 
     def refresh_state(self):
-        self.__reassign_strips()
-        self.__lock_enquiry_delay = 3
-
-    def update_display(self):
-        if self.__lock_enquiry_delay > 0:
-            self.__lock_enquiry_delay -= 1
-            if self.__lock_enquiry_delay == 0:
-                self.send_midi((176, 103, 1)) # ask the SlMk about the transport lock status -> responds with cc 79
-        if self.__rewind_button_down:
-            self.song().jump_by(-FORW_REW_JUMP_BY_AMOUNT)
-        if self.__forward_button_down:
-            self.song().jump_by(FORW_REW_JUMP_BY_AMOUNT)
-        #if self.song().is_playing:
-        self.updateStopButtons() # this would be better called by an event listener
-
-    def updateStopButtons(self):
-        for s in self.__strips:
-            if s.assigned_track() in tuple(self.song().tracks):
-                if s.assigned_track().fired_slot_index == -2:
-                    self.blink(FX_LOWER_BUTTON_ROW_BASE_CC + s.index())
-                elif s.assigned_track().playing_slot_index >= 0:
-                    mo.send_message((self.cc_status_byte(), FX_LOWER_BUTTON_ROW_BASE_CC + s.index(), NUM_CC_NO))
-                else:
-                    mo.send_message((self.cc_status_byte(), FX_LOWER_BUTTON_ROW_BASE_CC + s.index(), CC_VAL_BUTTON_RELEASED))
+        self.__midi_map_plan = None # the controller needs the feedback of a rebuild again
+        self.__reassign_strips(True)
+        self.tick_scheduler().cancel(self.__lock_enquiry_task)
+        self.__lock_enquiry_task = self.tick_scheduler().schedule(3, self.__send_lock_enquiry)
+
+    def __send_lock_enquiry(self):
+        self.__lock_enquiry_task = None
+        self.send_midi((self.cc_status_byte(), TS_LOCK_ENQUIRY_CC, 1)) # ask the SlMk about the transport lock status -> responds with cc 79
+
+    def set_stop_button_blinking(self, strip_index, blinking):
+        """The stop button LEDs of strips whose clips are about to stop blink with
+        every tick, all other stop button LEDs are set by the clip state listeners
+        of the strips.
+        """
+        if blinking:
+            self.__blinking_strips.add(strip_index)
+            if self.__blink_task == None:
+                self.__blink_task = self.tick_scheduler().schedule_repeating(1, self.__blink_stop_buttons)
+        else:
+            self.__blinking_strips.discard(strip_index)
+            if not self.__blinking_strips and self.__blink_task != None:
+                self.__blink_task.cancel()
+                self.__blink_task = None
 
-    def blink(self, led_index):
+    def __blink_stop_buttons(self):
         if self.__blink == CC_VAL_BUTTON_RELEASED:
             self.__blink = NUM_CC_NO
         else:
             self.__blink = CC_VAL_BUTTON_RELEASED
-        mo.send_message((self.cc_status_byte(), led_index, self.__blink))
-
-    def __reassign_strips(self):
+        for strip_index in self.__blinking_strips:
+            self.send_midi((self.cc_status_byte(), FX_LOWER_BUTTON_ROW_BASE_CC + strip_index, self.__blink), direct=True)
+
+    def __reassign_strips(self, force = False):
+        """Assigns the tracks of the current page to the strips. Strips that keep their
+        track are left alone, the display and the MIDI map are only set up again when
+        a strip got another track (or 'force' is set, e.g. on refresh_state).
+        """
         track_index = self.__strip_offset
         track_names = []
         parameters = []
-        for track in self.__assigned_tracks:
-            if track and track.name_has_listener(self.__on_track_name_changed):
-                track.remove_name_listener(self.__on_track_name_changed)
-
-        self.__assigned_tracks = []
-        all_tracks = tuple(self.song().visible_tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)
+        strips_changed = force
+        all_tracks = self.__track_index.all_tracks()
         for s in self.__strips:
+            track = None
             if track_index < len(all_tracks):
                 track = all_tracks[track_index]
+            if force or track != s.assigned_track():
                 s.set_assigned_track(track)
+                strips_changed = True
+            if track != None:
                 track_names.append(track.name)
                 parameters.append(s.slider_parameter())
-                track.add_name_listener(self.__on_track_name_changed)
-                self.__assigned_tracks.append(track)
             else:
-                s.set_assigned_track(None)
                 track_names.append('')
                 parameters.append(None)
             track_index += 1
 
-        self.__display_controller.setup_left_display(track_names, parameters)
-        self.request_rebuild_midi_map()
+        if strips_changed:
+            self.__display_controller.setup_left_display(track_names, parameters)
+            self.__request_rebuild_midi_map_if_changed()
         
         page_up_value = CC_VAL_BUTTON_RELEASED
         page_down_value = CC_VAL_BUTTON_RELEASED
@@ -235,7 +302,7 @@ class MixerController(RemoteSLComponent):
         self.send_midi((self.cc_status_byte(), MX_DISPLAY_PAGE_DOWN, page_down_value))
 
     def __handle_page_up_down_ccs(self, cc_no, cc_value):
-        all_tracks = tuple(self.song().visible_tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)
+        all_tracks = self.__track_index.all_tracks()
         if cc_no == MX_DISPLAY_PAGE_UP:
             if cc_value == CC_VAL_BUTTON_PRESSED:
                 if len(all_tracks) > NUM_CONTROLS_PER_ROW and self.__strip_offset < len(all_tracks) - NUM_CONTROLS_PER_ROW:
@@ -251,17 +318,17 @@ class MixerController(RemoteSLComponent):
 
     def __handle_transport_ccs(self, cc_no, cc_value):
         if cc_no == TS_REWIND_CC:
+            self.tick_scheduler().cancel(self.__rewind_task)
+            self.__rewind_task = None
             if cc_value == CC_VAL_BUTTON_PRESSED:
-                self.__rewind_button_down = True
-                self.song().jump_by(-FORW_REW_JUMP_BY_AMOUNT)
-            else:
-                self.__rewind_button_down = False
+                self.__jump_backward()
+                self.__rewind_task = self.tick_scheduler().schedule_repeating(1, self.__jump_backward)
         elif cc_no == TS_FORWARD_CC:
+            self.tick_scheduler().cancel(self.__forward_task)
+            self.__forward_task = None
             if cc_value == CC_VAL_BUTTON_PRESSED:
-                self.__forward_button_down = True
-                self.song().jump_by(FORW_REW_JUMP_BY_AMOUNT)
-            else:
-                self.__forward_button_down = False
+                self.__jump_forward()
+                self.__forward_task = self.tick_scheduler().schedule_repeating(1, self.__jump_forward)
         elif cc_no == TS_STOP_CC:
             if cc_value == CC_VAL_BUTTON_PRESSED:
                 self.song().stop_playing()
@@ -280,6 +347,12 @@ class MixerController(RemoteSLComponent):
         else:
             raise False or AssertionError, 'unknown Transport CC ' + str(cc_no)
 
+    def __jump_backward(self):
+        self.song().jump_by(-FORW_REW_JUMP_BY_AMOUNT)
+
+    def __jump_forward(self):
+        self.song().jump_by(FORW_REW_JUMP_BY_AMOUNT)
+
     def __on_transport_lock_changed(self):
         for strip in self.__strips:
             strip.take_control_of_second_button(not self.__transport_locked)
@@ -290,39 +363,43 @@ class MixerController(RemoteSLComponent):
             self.__on_record_mode_changed()
             
     def __on_tracks_added_or_deleted(self):
+        self.__track_index.invalidate()
         self.__validate_strip_offset()
         self.__reassign_strips()
 
-    def __on_track_name_changed(self):
-        self.__reassign_strips()
+    def __on_return_tracks_added_or_deleted(self):
+        # the number of sends of every track changed, so the encoders need new parameters
+        self.__track_index.invalidate()
+        self.__validate_strip_offset()
+        self.__reassign_strips(True)
 
     def __validate_strip_offset(self):
-        all_tracks = tuple(self.song().visible_tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)
+        all_tracks = self.__track_index.all_tracks()
         self.__strip_offset = min(self.__strip_offset, len(all_tracks) - 1)
         self.__strip_offset = max(0, self.__strip_offset)
 
     def __on_record_mode_changed(self):
         if self.__transport_locked:
             if self.song().record_mode:
-                self.send_midi((self.cc_status_byte(), 53, 1))
+                self.send_midi((self.cc_status_byte(), TS_RECORD_LED_CC, 1), lane=OUTPUT_LANE_TRANSPORT)
             else:
-                self.send_midi((self.cc_status_byte(), 53, 0))
+                self.send_midi((self.cc_status_byte(), TS_RECORD_LED_CC, 0), lane=OUTPUT_LANE_TRANSPORT)
 
     def __on_is_playing_changed(self):
         if self.__transport_locked:
             if self.song().is_playing:
-                self.send_midi((self.cc_status_byte(), 51, CC_VAL_BUTTON_PRESSED))
-                self.send_midi((self.cc_status_byte(), 50, CC_VAL_BUTTON_RELEASED))
+                self.send_midi((self.cc_status_byte(), TS_PLAY_LED_CC, CC_VAL_BUTTON_PRESSED), lane=OUTPUT_LANE_TRANSPORT)
+                self.send_midi((self.cc_status_byte(), TS_STOP_LED_CC, CC_VAL_BUTTON_RELEASED), lane=OUTPUT_LANE_TRANSPORT)
             else:
-                self.send_midi((self.cc_status_byte(), 51, CC_VAL_BUTTON_RELEASED))
-                self.send_midi((self.cc_status_byte(), 50, CC_VAL_BUTTON_PRESSED))
+                self.send_midi((self.cc_status_byte(), TS_PLAY_LED_CC, CC_VAL_BUTTON_RELEASED), lane=OUTPUT_LANE_TRANSPORT)
+                self.send_midi((self.cc_status_byte(), TS_STOP_LED_CC, CC_VAL_BUTTON_PRESSED), lane=OUTPUT_LANE_TRANSPORT)
 
     def __on_loop_changed(self):
         if self.__transport_locked:
             if self.song().loop:
-                self.send_midi((self.cc_status_byte(), 52, CC_VAL_BUTTON_PRESSED))
+                self.send_midi((self.cc_status_byte(), TS_LOOP_LED_CC, CC_VAL_BUTTON_PRESSED), lane=OUTPUT_LANE_TRANSPORT)
             else:
-                self.send_midi((self.cc_status_byte(), 52, CC_VAL_BUTTON_RELEASED))
+                self.send_midi((self.cc_status_byte(), TS_LOOP_LED_CC, CC_VAL_BUTTON_RELEASED), lane=OUTPUT_LANE_TRANSPORT)
 
     def is_arm_exclusive(self):
         return self.__parent.song().exclusive_arm
@@ -334,16 +411,22 @@ class MixerController(RemoteSLComponent):
         if track:
             self.__parent.song().view.selected_track = track
 
+    def strip_name_changed(self, strip_index, name):
+        self.__display_controller.set_left_strip_name(strip_index, name)
+
+    def strip_parameter_changed(self, strip_index, parameter):
+        self.__display_controller.left_strip_parameter_changed(strip_index, parameter)
+
     def track_about_to_arm(self, track):
         if track and self.__parent.song().exclusive_arm:
-            for t in self.__parent.song().tracks:
-                if t.can_be_armed and t.arm and not t == track:
+            for t in self.__track_state_index.armed_tracks():
+                if not t == track:
                     t.arm = False
 
     def track_about_to_solo(self, track):
         if track and self.__parent.song().exclusive_solo:
-            for t in self.__parent.song().tracks:
-                if t.solo and not t == track:
+            for t in self.__track_state_index.soloed_tracks():
+                if not t == track:
                     t.solo = False
 
 
@@ -356,6 +439,10 @@ class MixerChannelStrip():
         self.__index = index
         self.__assigned_track = None
         self.__control_second_button = True
+        self.__slider_parameter = None
+        self.__encoder_parameter = None
+        self.__potie_parameter = None
+        self.__clip_state_track = None
 
     def index(self):
         return self.__index
@@ -363,11 +450,17 @@ class MixerChannelStrip():
     def song(self):
         return self.__mixer_controller.song()
 
+    def track_index(self):
+        return self.__mixer_controller.track_index()
+
     def assigned_track(self):
         return self.__assigned_track
 
     def set_assigned_track(self, track):
+        self.__remove_value_listeners()
+        self.__remove_clip_state_listeners()
         if self.__assigned_track != None:
+            self.__assigned_track.remove_name_listener(self._on_name_changed)
             if self.__assigned_track != self.song().master_track:
                 self.__assigned_track.remove_mute_listener(self._on_mute_changed)
                 self.__assigned_track.remove_solo_listener(self._on_solo_changed)
@@ -375,13 +468,56 @@ class MixerChannelStrip():
                 self.__assigned_track.remove_arm_listener(self._on_arm_changed)
         self.__assigned_track = track
         if self.__assigned_track != None:
+            self.__assigned_track.add_name_listener(self._on_name_changed)
             if self.__assigned_track != self.song().master_track:
                 self.__assigned_track.add_mute_listener(self._on_mute_changed)
                 self.__assigned_track.add_solo_listener(self._on_solo_changed)
             if self.__assigned_track.can_be_armed:
                 self.__assigned_track.add_arm_listener(self._on_arm_changed)
+            self.__add_value_listeners()
+            self.__add_clip_state_listeners()
         self._on_mute_changed()
         self._on_arm_changed()
+        self._on_clip_state_changed()
+
+    def __add_value_listeners(self):
+        self.__slider_parameter = self.slider_parameter()
+        self.__encoder_parameter = self.encoder_parameter()
+        self.__potie_parameter = self.potie_parameter()
+        self.__slider_parameter.add_value_listener(self._on_slider_value_changed)
+        if self.__encoder_parameter != None:
+            self.__encoder_parameter.add_value_listener(self._on_encoder_value_changed)
+        self.__potie_parameter.add_value_listener(self._on_potie_value_changed)
+
+    def __remove_value_listeners(self):
+        if self.__slider_parameter != None and self.__slider_parameter.value_has_listener(self._on_slider_value_changed):
+            self.__slider_parameter.remove_value_listener(self._on_slider_value_changed)
+        if self.__encoder_parameter != None and self.__encoder_parameter.value_has_listener(self._on_encoder_value_changed):
+            self.__encoder_parameter.remove_value_listener(self._on_encoder_value_changed)
+        if self.__potie_parameter != None and self.__potie_parameter.value_has_listener(self._on_potie_value_changed):
+            self.__potie_parameter.remove_value_listener(self._on_potie_value_changed)
+        self.__slider_parameter = None
+        self.__encoder_parameter = None
+        self.__potie_parameter = None
+
+    def __add_clip_state_listeners(self):
+        # only regular tracks have clip slots
+        if self.track_index().is_track(self.__assigned_track):
+            self.__clip_state_track = self.__assigned_track
+            self.__clip_state_track.add_fired_slot_index_listener(self._on_clip_state_changed)
+            self.__clip_state_track.add_playing_slot_index_listener(self._on_clip_state_changed)
+
+    def __remove_clip_state_listeners(self):
+        # a deleted track compares equal to None, its listeners are gone with it
+        if self.__clip_state_track != None:
+            self.__clip_state_track.remove_fired_slot_index_listener(self._on_clip_state_changed)
+            self.__clip_state_track.remove_playing_slot_index_listener(self._on_clip_state_changed)
+        self.__clip_state_track = None
+
+    def mapped_parameters(self):
+        """The slider, encoder and potie parameters of the assigned track (or None)
+        """
+        return (self.__slider_parameter, self.__encoder_parameter, self.__potie_parameter)
 
     def slider_parameter(self):
         return self.__assigned_track.mixer_device.volume
@@ -398,6 +534,12 @@ class MixerChannelStrip():
     def slider_moved(self, cc_value):
         pass
 
+    def encoder_moved(self, cc_value):
+        pass
+
+    def potie_moved(self, cc_value):
+        pass
+
     def take_control_of_second_button(self, take_control):
         self.__mixer_controller.remote_sl_parent().send_midi((self.__mixer_controller.cc_status_byte(), self.__index + MX_SECOND_BUTTON_ROW_BASE_CC, 0))
         self.__control_second_button = take_control
@@ -406,11 +548,11 @@ class MixerChannelStrip():
 
     def first_button_pressed(self):
         if self.__assigned_track:
-            if self.__assigned_track in tuple(self.song().visible_tracks) + tuple(self.song().return_tracks):
+            if self.track_index().is_visible_track(self.__assigned_track) or self.track_index().is_return_track(self.__assigned_track):
                 self.__assigned_track.mute = not self.__assigned_track.mute
 
     def second_button_pressed(self):
-        if self.__assigned_track in self.song().visible_tracks:
+        if self.track_index().is_visible_track(self.__assigned_track):
             if self.__assigned_track.can_be_armed:
                 self.__mixer_controller.track_about_to_arm(self.__assigned_track)
                 self.__assigned_track.arm = not self.__assigned_track.arm
@@ -419,38 +561,61 @@ class MixerChannelStrip():
 
     def solo_button_pressed(self):
         if self.__assigned_track:
-            if self.__assigned_track in tuple(self.song().visible_tracks) + tuple(self.song().return_tracks):
+            if self.track_index().is_visible_track(self.__assigned_track) or self.track_index().is_return_track(self.__assigned_track):
                 self.__mixer_controller.track_about_to_solo(self.__assigned_track)
                 self.__assigned_track.solo = not self.__assigned_track.solo
 
     def stop_button_pressed(self):
         if self.__assigned_track:
-            if self.__assigned_track in tuple(self.song().visible_tracks) + (self.song().master_track,):
-                if self.__assigned_track == self.song().master_track:
+            if self.track_index().is_visible_track(self.__assigned_track) or self.track_index().is_master_track(self.__assigned_track):
+                if self.track_index().is_master_track(self.__assigned_track):
                     self.song().stop_all_clips()
                 else:
                     self.__assigned_track.stop_all_clips()
     
     def select_button_pressed(self):
         if self.__assigned_track:
-            if self.__assigned_track in tuple(self.song().visible_tracks) + tuple(self.song().return_tracks) + (self.song().master_track,):
+            if self.track_index().position(self.__assigned_track) >= 0:
                 self.__mixer_controller.set_selected_track(self.__assigned_track)
 
+    def _on_name_changed(self):
+        self.__mixer_controller.strip_name_changed(self.__index, self.__assigned_track.name)
+
+    def _on_slider_value_changed(self):
+        self.__mixer_controller.strip_parameter_changed(self.__index, self.__slider_parameter)
+
+    def _on_encoder_value_changed(self):
+        self.__mixer_controller.strip_parameter_changed(self.__index, self.__encoder_parameter)
+
+    def _on_potie_value_changed(self):
+        self.__mixer_controller.strip_parameter_changed(self.__index, self.__potie_parameter)
+
     def _on_mute_changed(self):
         value = CC_VAL_BUTTON_RELEASED
-        if self.__assigned_track in tuple(self.song().tracks) + tuple(self.song().return_tracks) and not self.__assigned_track.mute:
+        if (self.track_index().is_track(self.__assigned_track) or self.track_index().is_return_track(self.__assigned_track)) and not self.__assigned_track.mute:
             value = CC_VAL_BUTTON_PRESSED
         self.__mixer_controller.remote_sl_parent().send_midi((self.__mixer_controller.cc_status_byte(), self.__index + MX_FIRST_BUTTON_ROW_BASE_CC, value))
 
     def _on_arm_changed(self):
         if self.__control_second_button:
             value = CC_VAL_BUTTON_RELEASED
-            if self.__assigned_track and self.__assigned_track in self.song().tracks and self.__assigned_track.can_be_armed and self.__assigned_track.arm:
+            if self.track_index().is_track(self.__assigned_track) and self.__assigned_track.can_be_armed and self.__assigned_track.arm:
                 value = CC_VAL_BUTTON_PRESSED
             self.__mixer_controller.remote_sl_parent().send_midi((self.__mixer_controller.cc_status_byte(), self.__index + MX_SECOND_BUTTON_ROW_BASE_CC, value))
 
+    def _on_clip_state_changed(self):
+        track = self.__clip_state_track
+        if track != None and track.fired_slot_index == -2:
+            self.__mixer_controller.set_stop_button_blinking(self.__index, True)
+            return
+        value = CC_VAL_BUTTON_RELEASED
+        if track != None and track.playing_slot_index >= 0:
+            value = NUM_CC_NO
+        self.__mixer_controller.set_stop_button_blinking(self.__index, False)
+        self.__mixer_controller.remote_sl_parent().send_midi((self.__mixer_controller.cc_status_byte(), self.__index + FX_LOWER_BUTTON_ROW_BASE_CC, value), direct=True)
+
     def _on_solo_changed(self):
         value = CC_VAL_BUTTON_RELEASED
-        if self.__assigned_track in tuple(self.song().tracks) and self.__assigned_track.solo:
+        if self.track_index().is_track(self.__assigned_track) and self.__assigned_track.solo:
             value = NUM_CC_NO
         self.__mixer_controller.remote_sl_parent().send_midi((self.__mixer_controller.cc_status_byte(), self.__index + FX_UPPER_BUTTON_ROW_BASE_CC, value))
\ No newline at end of file
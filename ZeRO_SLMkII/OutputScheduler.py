@@ -0,0 +1,106 @@
+from collections import deque
+from consts import *
+
+def lane_for_message(midi_bytes):
+    """LED feedback goes first and display sysex last. The handshake sysex shares
+    the LED lane, so it stays in front of the LED updates of a refresh.
+    The transport lane is never chosen by the message: the transport LEDs share
+    their CCs with the second button row, so the sender picks it.
+    """
+    if midi_bytes[0] == 240 and len(midi_bytes) > SYSEX_COMMAND_POS and midi_bytes[SYSEX_COMMAND_POS] == SYSEX_DISPLAY_COMMAND:
+        return OUTPUT_LANE_DISPLAY
+    return OUTPUT_LANE_LED
+
+
+class OutputScheduler():
+    """Queues all outgoing MIDI messages in priority lanes and sends them with
+    a limited number of bytes per tick. What doesn't fit into the budget of a
+    tick stays queued (in order) for the next one.
+
+    Counters:
+    'deferred' counts how often a message had to wait for the next tick,
+    'dropped' the messages that were thrown away because their lane was full
+    (the oldest message of the lane is dropped). The dropped message is passed to
+    the dropped message listener, so its sender can send the state again.
+    """
+
+    def __init__(self, bytes_per_tick = OUTPUT_BYTES_PER_TICK, max_queued_messages = OUTPUT_MAX_QUEUED_MESSAGES):
+        self.__lanes = [ deque() for lane in OUTPUT_LANES ]
+        self.__bytes_per_tick = bytes_per_tick
+        self.__max_queued_messages = max_queued_messages
+        self.__remaining_bytes = bytes_per_tick
+        self.__sent_messages = 0
+        self.__sent_bytes = 0
+        self.__deferred_messages = 0
+        self.__dropped_messages = 0
+        self.__dropped_message_listener = None
+
+    def set_dropped_message_listener(self, listener):
+        self.__dropped_message_listener = listener
+
+    def set_bytes_per_tick(self, bytes_per_tick):
+        self.__bytes_per_tick = bytes_per_tick
+
+    def enqueue(self, midi_bytes, send_function, lane = None):
+        """Queues the message, 'send_function' is called with the message and its lane
+        when it is its turn. Without a 'lane' the lane is chosen by the message type.
+        """
+        if lane is None:
+            lane = lane_for_message(midi_bytes)
+        queue = self.__lanes[lane]
+        if len(queue) >= self.__max_queued_messages:
+            dropped_midi_bytes = queue.popleft()[0]
+            self.__dropped_messages += 1
+            if self.__dropped_message_listener is not None:
+                self.__dropped_message_listener(dropped_midi_bytes)
+        queue.append((midi_bytes, send_function))
+
+    def has_pending_messages(self):
+        for queue in self.__lanes:
+            if queue:
+                return True
+        return False
+
+    def begin_tick(self):
+        """Starts a new tick: refills the budget and accounts the messages that are
+        still waiting from the last tick.
+        """
+        self.__remaining_bytes = self.__bytes_per_tick
+        for queue in self.__lanes:
+            self.__deferred_messages += len(queue)
+
+    def flush(self):
+        """Sends queued messages, highest priority lane first, as long as the budget
+        of the current tick allows. A message bigger than the whole budget is sent
+        alone at the start of a tick, so it can't block its lane forever.
+        """
+        for lane, queue in enumerate(self.__lanes):
+            while queue:
+                midi_bytes = queue[0][0]
+                if len(midi_bytes) > self.__remaining_bytes and self.__remaining_bytes < self.__bytes_per_tick:
+                    return
+                queue.popleft()[1](midi_bytes, lane)
+                self.__remaining_bytes -= len(midi_bytes)
+                self.__sent_messages += 1
+                self.__sent_bytes += len(midi_bytes)
+
+    def flush_all(self):
+        """Sends everything that is queued, ignoring the budget (used on disconnect)
+        """
+        for lane, queue in enumerate(self.__lanes):
+            while queue:
+                midi_bytes, send_function = queue.popleft()
+                send_function(midi_bytes, lane)
+                self.__sent_messages += 1
+                self.__sent_bytes += len(midi_bytes)
+
+    def clear(self):
+        for queue in self.__lanes:
+            queue.clear()
+
+    def counters(self):
+        return {'sent_messages': self.__sent_messages,
+         'sent_bytes': self.__sent_bytes,
+         'deferred_messages': self.__deferred_messages,
+         'dropped_messages': self.__dropped_messages,
+         'queued_messages': sum([ len(queue) for queue in self.__lanes ])}
@@ -15,8 +15,14 @@ class RemoteSLComponent:
     def song(self):
         return self.__parent.song()
 
-    def send_midi(self, midi_event_bytes):
-        self.__parent.send_midi(midi_event_bytes)
+    def logger(self):
+        return self.__parent.logger()
+
+    def tick_scheduler(self):
+        return self.__parent.tick_scheduler()
+
+    def send_midi(self, midi_event_bytes, direct = False, lane = None):
+        self.__parent.send_midi(midi_event_bytes, direct, lane)
 
     def request_rebuild_midi_map(self):
         self.__parent.request_rebuild_midi_map()
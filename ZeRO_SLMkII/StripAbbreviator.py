@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from consts import *
+
+DEFAULT_TRANSLITERATION = {u'ä': u'a',
+ u'ö': u'o',
+ u'ü': u'u',
+ u'Ä': u'A',
+ u'Ö': u'O',
+ u'Ü': u'U',
+ u'ß': u'ss',
+ u'à': u'a',
+ u'á': u'a',
+ u'â': u'a',
+ u'å': u'a',
+ u'ç': u'c',
+ u'è': u'e',
+ u'é': u'e',
+ u'ê': u'e',
+ u'ë': u'e',
+ u'ì': u'i',
+ u'í': u'i',
+ u'î': u'i',
+ u'ï': u'i',
+ u'ñ': u'n',
+ u'ò': u'o',
+ u'ó': u'o',
+ u'ô': u'o',
+ u'ø': u'o',
+ u'ù': u'u',
+ u'ú': u'u',
+ u'û': u'u',
+ u'À': u'A',
+ u'Á': u'A',
+ u'Â': u'A',
+ u'Å': u'A',
+ u'Ç': u'C',
+ u'È': u'E',
+ u'É': u'E',
+ u'Ê': u'E',
+ u'Ñ': u'N',
+ u'Ó': u'O',
+ u'Ø': u'O',
+ u'Ú': u'U'}
+
+class StripAbbreviator():
+    """Turns track names and parameter values into display strip strings.
+    Results are kept in a bounded LRU cache keyed by the input string, so names
+    that don't change between two display updates are not abbreviated again.
+    Non ASCII characters are replaced by the registered transliteration tables
+    before abbreviating, characters without a transliteration become blanks.
+    """
+
+    def __init__(self, cache_size = DISPLAY_STRING_CACHE_SIZE):
+        self.__cache_size = cache_size
+        self.__cache = OrderedDict()
+        self.__marquee_cache = OrderedDict()
+        self.__transliteration = {}
+        self.register_transliteration(DEFAULT_TRANSLITERATION)
+
+    def register_transliteration(self, table):
+        """Adds the given {unicode character: replacement} entries. Later tables
+        override characters of earlier ones.
+        """
+        for char, replacement in table.items():
+            self.__transliteration[ord(char)] = unicode(replacement)
+        self.clear_cache()
+
+    def clear_cache(self):
+        self.__cache.clear()
+        self.__marquee_cache.clear()
+
+    def render_strips(self, display_strings):
+        """Returns the display line for all strips, one strip string per entry of
+        'display_strings' (use an empty string or None for an empty strip)
+        """
+        return ''.join([ self.strip_string(s) for s in display_strings ])
+
+    def strip_string(self, display_string):
+        """returns a NUM_CHARS_PER_DISPLAY_STRIP char string for the passed string,
+        with a blank as strip separator at the end
+        """
+        if not display_string:
+            return ' ' * NUM_CHARS_PER_DISPLAY_STRIP
+        return self.__cached(self.__cache, display_string, self.__generate_strip_string)
+
+    def marquee_frames(self, display_string):
+        """returns a tuple with all strip strings needed to scroll the passed string
+        through a strip. Strings that fit into a strip have only one frame, the same
+        string strip_string returns.
+        """
+        return self.__cached(self.__marquee_cache, display_string or '', self.__generate_marquee_frames)
+
+    def __cached(self, cache, display_string, generator):
+        ret = cache.pop(display_string, None)
+        if ret is None:
+            ret = generator(display_string)
+            if len(cache) >= self.__cache_size:
+                cache.popitem(last=False)
+        cache[display_string] = ret
+        return ret
+
+    def __generate_marquee_frames(self, display_string):
+        text = self.__transliterate(display_string).strip()
+        if len(text) <= NUM_CHARS_PER_DISPLAY_STRIP - 1:
+            return (self.strip_string(display_string),)
+        text += ' ' * DISPLAY_MARQUEE_GAP
+        scroll_text = text + text[:NUM_CHARS_PER_DISPLAY_STRIP - 1]
+        frames = [ self.__to_ascii(scroll_text[i:i + NUM_CHARS_PER_DISPLAY_STRIP - 1]) for i in range(len(text)) ]
+        return tuple(frames[:1] * DISPLAY_MARQUEE_HOLD_FRAMES + frames[1:])
+
+    def __transliterate(self, display_string):
+        if isinstance(display_string, str):
+            display_string = display_string.decode('utf-8', 'replace')
+        return display_string.translate(self.__transliteration)
+
+    def __to_ascii(self, display_string):
+        ret = u''.join([ c if ord(c) < 128 else u' ' for c in display_string[:NUM_CHARS_PER_DISPLAY_STRIP - 1] ])
+        return ret.encode('ascii').ljust(NUM_CHARS_PER_DISPLAY_STRIP)
+
+    def __generate_strip_string(self, display_string):
+        """ Hack: Shamelessly stolen from the MainDisplayController of the Mackie Control.
+
+        returns a strip string for of the passed string, trying to remove not so important
+        letters and signs first...
+        """
+        display_string = self.__transliterate(display_string)
+        if len(display_string.strip()) > NUM_CHARS_PER_DISPLAY_STRIP - 1 and display_string.endswith('dB') and display_string.find('.') != -1:
+            display_string = display_string[:-2]
+        if len(display_string) > NUM_CHARS_PER_DISPLAY_STRIP - 1:
+            for um in [' ',
+             'i',
+             'o',
+             'u',
+             'e',
+             'a']:
+                while len(display_string) > NUM_CHARS_PER_DISPLAY_STRIP - 1 and display_string.rfind(um, 1) != -1:
+                    um_pos = display_string.rfind(um, 1)
+                    display_string = display_string[:um_pos] + display_string[um_pos + 1:]
+
+        else:
+            display_string = display_string.center(NUM_CHARS_PER_DISPLAY_STRIP - 1)
+        return self.__to_ascii(display_string)
+
@@ -0,0 +1,43 @@
+from consts import *
+
+DISPLAY_TEXT_HEADER = bytearray(SYSEX_HEADER + DISPLAY_TEXT_COMMAND)
+DISPLAY_OFFSET_POS = len(DISPLAY_TEXT_HEADER)
+DISPLAY_ROW_POS = DISPLAY_OFFSET_POS + 1
+DISPLAY_TEXT_POS = DISPLAY_ROW_POS + 2
+CLEAR_LEFT_DISPLAY_MESSAGE = tuple(bytearray(SYSEX_HEADER + DISPLAY_CLEAR_COMMAND + (DISPLAY_CLEAR_LEFT, SYSEX_END)))
+CLEAR_RIGHT_DISPLAY_MESSAGE = tuple(bytearray(SYSEX_HEADER + DISPLAY_CLEAR_COMMAND + (DISPLAY_CLEAR_RIGHT, SYSEX_END)))
+
+class SysexEncoder():
+    """Builds the display sysex messages of the RemoteSL from precompiled templates.
+    Every display row has its own buffer, holding the header, the row id and a full
+    line of text. The text is copied into the buffer with one slice assignment.
+    The returned messages are tuples, so they can be passed to
+    c_instance.send_midi as well as to rtmidi.MidiOut.send_message.
+    """
+
+    def __init__(self):
+        self.__row_buffers = [None]
+        for row_id in range(1, 5):
+            row_buffer = DISPLAY_TEXT_HEADER + bytearray((0, row_id, DISPLAY_WRITE_TEXT))
+            row_buffer += bytearray(' ' * NUM_CHARS_PER_DISPLAY_LINE + chr(SYSEX_END))
+            self.__row_buffers.append(row_buffer)
+
+    def display_string_message(self, message, row_id, offset = 0):
+        """Returns the sysex writing 'message' to the row 'row_id', starting at
+        the character 'offset'. The text is clipped at the end of the row and must
+        only contain ASCII characters.
+        """
+        if not isinstance(message, str):
+            message = message.encode('ascii', 'replace')
+        text_end = DISPLAY_TEXT_POS + len(message)
+        if text_end > DISPLAY_TEXT_POS + NUM_CHARS_PER_DISPLAY_LINE - offset:
+            text_end = DISPLAY_TEXT_POS + NUM_CHARS_PER_DISPLAY_LINE - offset
+            message = message[0:NUM_CHARS_PER_DISPLAY_LINE - offset]
+        row_buffer = self.__row_buffers[row_id]
+        row_buffer[DISPLAY_OFFSET_POS] = offset
+        row_buffer[DISPLAY_TEXT_POS:text_end] = message
+        row_buffer[text_end] = SYSEX_END
+        return tuple(row_buffer[0:text_end + 1])
+
+    def clear_display_messages(self):
+        return (CLEAR_LEFT_DISPLAY_MESSAGE, CLEAR_RIGHT_DISPLAY_MESSAGE)
@@ -0,0 +1,100 @@
+import traceback
+from timeit import default_timer
+from consts import *
+
+class ScheduledTask():
+    """A callback scheduled in the TickScheduler, 'interval' is 0 for one shot tasks.
+    The time spent in the callback is accounted under 'name' (see TickScheduler.costs).
+    """
+
+    def __init__(self, callback, interval, name):
+        self.callback = callback
+        self.interval = interval
+        self.name = name
+        self.due_tick = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TickScheduler():
+    """Runs tasks after a number of ticks (update_display calls, every 100 ms).
+    Tasks are kept in a timer wheel of 'wheel_size' slots, so a tick only looks at
+    the tasks of one slot: with nothing due, a tick costs one list check. Tasks due
+    more than one turn of the wheel ahead stay in their slot until their tick.
+    Cancelled tasks are dropped when their slot comes up.
+    An exception in a callback is logged through 'logger' (a Logger) and doesn't
+    keep the other tasks from running.
+    """
+
+    def __init__(self, logger, wheel_size = TICK_WHEEL_SIZE):
+        self.__logger = logger
+        self.__wheel = [ [] for x in range(wheel_size) ]
+        self.__tick = 0
+        self.__costs = {}
+
+    def current_tick(self):
+        return self.__tick
+
+    def schedule(self, delay, callback, name = None):
+        """Calls 'callback' once, 'delay' ticks from now (at least one)
+        """
+        task = ScheduledTask(callback, 0, name or callback.__name__)
+        self.__insert(task, self.__tick + max(delay, 1))
+        return task
+
+    def schedule_repeating(self, interval, callback, name = None, delay = None):
+        """Calls 'callback' every 'interval' ticks, the first time after 'delay' ticks
+        (default 'interval'), until the task is cancelled
+        """
+        interval = max(interval, 1)
+        task = ScheduledTask(callback, interval, name or callback.__name__)
+        if delay is None:
+            delay = interval
+        self.__insert(task, self.__tick + max(delay, 1))
+        return task
+
+    def cancel(self, task):
+        if task != None:
+            task.cancel()
+
+    def tick(self):
+        """Advances one tick and runs the tasks that are due. A task whose callback
+        raises is logged and still rescheduled, if it repeats.
+        """
+        self.__tick += 1
+        tick = self.__tick
+        slot_index = tick % len(self.__wheel)
+        tasks = self.__wheel[slot_index]
+        if not tasks:
+            return
+        self.__wheel[slot_index] = []
+        for task in tasks:
+            if task.cancelled:
+                continue
+            if task.due_tick > tick:
+                self.__wheel[slot_index].append(task)
+                continue
+            start = default_timer()
+            try:
+                task.callback()
+            except Exception:
+                self.__logger.sampled(LOG_LEVEL_ERROR, 'task ' + task.name, 'task %s failed: %s', task.name, traceback.format_exc())
+            self.__account(task.name, default_timer() - start)
+            if task.interval and not task.cancelled:
+                self.__insert(task, tick + task.interval)
+
+    def costs(self):
+        """Returns {task name: (calls, total seconds, max seconds)} of all tasks that ran,
+        summed up over all tasks with the same name
+        """
+        return dict(self.__costs)
+
+    def __account(self, name, seconds):
+        calls, total_seconds, max_seconds = self.__costs.get(name, (0, 0.0, 0.0))
+        self.__costs[name] = (calls + 1, total_seconds + seconds, max(max_seconds, seconds))
+
+    def __insert(self, task, due_tick):
+        task.due_tick = due_tick
+        self.__wheel[due_tick % len(self.__wheel)].append(task)
@@ -0,0 +1,88 @@
+class TrackIndex():
+    """Index of the tracks the strips can show: the visible tracks, the return tracks
+    and the master track, in this order.
+    Tracks are identified by their '_live_ptr' (Live may hand out different Python
+    objects for the same track), so position and membership lookups are dict and
+    set lookups instead of scanning the song's track tuples. The index is rebuilt
+    lazily, on the first lookup after Live reported a change of the track lists
+    (or after invalidate was called).
+    """
+
+    def __init__(self, song):
+        self.__song = song
+        self.__dirty = True
+        self.__all_tracks = ()
+        self.__positions = {}
+        self.__visible_tracks = frozenset()
+        self.__tracks = frozenset()
+        self.__return_tracks = frozenset()
+        self.__master_track = None
+        self.__song.add_visible_tracks_listener(self.__on_track_lists_changed)
+        self.__song.add_tracks_listener(self.__on_track_lists_changed)
+        self.__song.add_return_tracks_listener(self.__on_track_lists_changed)
+
+    def disconnect(self):
+        self.__song.remove_visible_tracks_listener(self.__on_track_lists_changed)
+        self.__song.remove_tracks_listener(self.__on_track_lists_changed)
+        self.__song.remove_return_tracks_listener(self.__on_track_lists_changed)
+
+    def invalidate(self):
+        """Rebuilds the index with the next lookup. Called by listeners of the track
+        lists, which can't rely on being called after the listeners of the index.
+        """
+        self.__dirty = True
+
+    def all_tracks(self):
+        """The visible tracks, the return tracks and the master track
+        """
+        if self.__dirty:
+            self.__rebuild()
+        return self.__all_tracks
+
+    def position(self, track):
+        """The index of 'track' in all_tracks, or -1
+        """
+        if self.__dirty:
+            self.__rebuild()
+        if track == None:
+            return -1
+        return self.__positions.get(track._live_ptr, -1)
+
+    def is_visible_track(self, track):
+        """True for a regular track that is visible (not folded into a group)
+        """
+        if self.__dirty:
+            self.__rebuild()
+        return track != None and track._live_ptr in self.__visible_tracks
+
+    def is_track(self, track):
+        """True for a regular track, visible or not
+        """
+        if self.__dirty:
+            self.__rebuild()
+        return track != None and track._live_ptr in self.__tracks
+
+    def is_return_track(self, track):
+        if self.__dirty:
+            self.__rebuild()
+        return track != None and track._live_ptr in self.__return_tracks
+
+    def is_master_track(self, track):
+        if self.__dirty:
+            self.__rebuild()
+        return track != None and track._live_ptr == self.__master_track
+
+    def __on_track_lists_changed(self):
+        self.__dirty = True
+
+    def __rebuild(self):
+        song = self.__song
+        visible_tracks = tuple(song.visible_tracks)
+        return_tracks = tuple(song.return_tracks)
+        self.__all_tracks = visible_tracks + return_tracks + (song.master_track,)
+        self.__positions = dict([ (track._live_ptr, index) for index, track in enumerate(self.__all_tracks) ])
+        self.__visible_tracks = frozenset([ track._live_ptr for track in visible_tracks ])
+        self.__tracks = frozenset([ track._live_ptr for track in song.tracks ])
+        self.__return_tracks = frozenset([ track._live_ptr for track in return_tracks ])
+        self.__master_track = song.master_track._live_ptr
+        self.__dirty = False
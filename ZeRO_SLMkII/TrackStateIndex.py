@@ -0,0 +1,73 @@
+class TrackStateIndex():
+    """Keeps the sets of armed and soloed tracks up to date through arm and solo
+    listeners on all tracks (solo also on the return tracks), so exclusive arm/solo
+    and the bulk actions only touch the tracks that are actually armed or soloed.
+    Tracks are identified by their '_live_ptr', see TrackIndex. The listeners are
+    updated when tracks are added or deleted, only for the tracks that changed.
+    """
+
+    def __init__(self, song):
+        self.__song = song
+        self.__listeners = {}
+        self.__armed_tracks = {}
+        self.__soloed_tracks = {}
+        self.__song.add_tracks_listener(self.__on_track_lists_changed)
+        self.__song.add_return_tracks_listener(self.__on_track_lists_changed)
+        self.__on_track_lists_changed()
+
+    def disconnect(self):
+        self.__song.remove_tracks_listener(self.__on_track_lists_changed)
+        self.__song.remove_return_tracks_listener(self.__on_track_lists_changed)
+        for live_ptr in self.__listeners.keys():
+            self.__remove_track(live_ptr)
+
+    def armed_tracks(self):
+        return self.__armed_tracks.values()
+
+    def soloed_tracks(self):
+        return self.__soloed_tracks.values()
+
+    def __on_track_lists_changed(self):
+        tracks = dict([ (track._live_ptr, track) for track in tuple(self.__song.tracks) + tuple(self.__song.return_tracks) ])
+        for live_ptr in self.__listeners.keys():
+            if live_ptr not in tracks:
+                self.__remove_track(live_ptr)
+        for live_ptr, track in tracks.items():
+            if live_ptr not in self.__listeners:
+                self.__add_track(track)
+
+    def __add_track(self, track):
+        on_arm_changed = None
+        if track.can_be_armed:
+            on_arm_changed = lambda : self.__on_arm_changed(track)
+            track.add_arm_listener(on_arm_changed)
+            self.__on_arm_changed(track)
+        on_solo_changed = lambda : self.__on_solo_changed(track)
+        track.add_solo_listener(on_solo_changed)
+        self.__on_solo_changed(track)
+        self.__listeners[track._live_ptr] = (track, on_arm_changed, on_solo_changed)
+
+    def __remove_track(self, live_ptr):
+        """Called after Live deleted the track, a deleted track compares equal to None
+        and its listeners are gone with it.
+        """
+        track, on_arm_changed, on_solo_changed = self.__listeners.pop(live_ptr)
+        self.__armed_tracks.pop(live_ptr, None)
+        self.__soloed_tracks.pop(live_ptr, None)
+        if track != None:
+            if on_arm_changed != None and track.arm_has_listener(on_arm_changed):
+                track.remove_arm_listener(on_arm_changed)
+            if track.solo_has_listener(on_solo_changed):
+                track.remove_solo_listener(on_solo_changed)
+
+    def __on_arm_changed(self, track):
+        if track.arm:
+            self.__armed_tracks[track._live_ptr] = track
+        else:
+            self.__armed_tracks.pop(track._live_ptr, None)
+
+    def __on_solo_changed(self, track):
+        if track.solo:
+            self.__soloed_tracks[track._live_ptr] = track
+        else:
+            self.__soloed_tracks.pop(track._live_ptr, None)
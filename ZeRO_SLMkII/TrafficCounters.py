@@ -0,0 +1,165 @@
+import time
+from consts import *
+
+TRAFFIC_OUT_DISPLAY = 0
+TRAFFIC_OUT_HANDSHAKE = 1
+TRAFFIC_OUT_LED = 2
+TRAFFIC_OUT_TRANSPORT_LED = 3
+TRAFFIC_OUT_RING_MODE = 4
+TRAFFIC_OUT_OTHER = 5
+TRAFFIC_IN_SLIDERS = 6
+TRAFFIC_IN_ENCODERS = 7
+TRAFFIC_IN_POTIES = 8
+TRAFFIC_IN_FIRST_BUTTONS = 9
+TRAFFIC_IN_SECOND_BUTTONS = 10
+TRAFFIC_IN_UPPER_BUTTONS = 11
+TRAFFIC_IN_LOWER_BUTTONS = 12
+TRAFFIC_IN_TRANSPORT = 13
+TRAFFIC_IN_PAGE_BUTTONS = 14
+TRAFFIC_IN_DRUM_PADS = 15
+TRAFFIC_IN_HANDSHAKE = 16
+TRAFFIC_IN_OTHER = 17
+TRAFFIC_CATEGORY_NAMES = ('out display sysex',
+ 'out handshake sysex',
+ 'out LED',
+ 'out transport LED',
+ 'out encoder ring mode',
+ 'out other',
+ 'in sliders',
+ 'in encoders',
+ 'in poties',
+ 'in first buttons',
+ 'in second buttons',
+ 'in upper buttons',
+ 'in lower buttons',
+ 'in transport',
+ 'in page buttons',
+ 'in drum pads',
+ 'in handshake sysex',
+ 'in other')
+
+OUT_CC_CATEGORIES = [ TRAFFIC_OUT_LED for cc_no in range(NUM_CC_NO + 1) ]
+OUT_CC_CATEGORIES[TS_LOCK_ENQUIRY_CC] = TRAFFIC_OUT_TRANSPORT_LED
+for cc_no in fx_encoder_led_mode_ccs:
+    OUT_CC_CATEGORIES[cc_no] = TRAFFIC_OUT_RING_MODE
+
+IN_CC_CATEGORIES = [ TRAFFIC_IN_OTHER for cc_no in range(NUM_CC_NO + 1) ]
+for ccs, category in ((mx_slider_row_ccs, TRAFFIC_IN_SLIDERS),
+ (fx_encoder_row_ccs, TRAFFIC_IN_ENCODERS),
+ (fx_poti_row_ccs, TRAFFIC_IN_POTIES),
+ (mx_first_button_row_ccs, TRAFFIC_IN_FIRST_BUTTONS),
+ (mx_second_button_row_ccs, TRAFFIC_IN_SECOND_BUTTONS),
+ (fx_upper_button_row_ccs, TRAFFIC_IN_UPPER_BUTTONS),
+ (fx_lower_button_row_ccs, TRAFFIC_IN_LOWER_BUTTONS),
+ (ts_ccs, TRAFFIC_IN_TRANSPORT),
+ (mx_display_button_ccs, TRAFFIC_IN_PAGE_BUTTONS)):
+    for cc_no in ccs:
+        IN_CC_CATEGORIES[cc_no] = category
+
+def received_category(midi_bytes):
+    """The traffic category of a received message, by control row
+    """
+    status = midi_bytes[0] & 240
+    if status == CC_STATUS:
+        return IN_CC_CATEGORIES[midi_bytes[1]]
+    elif status == NOTE_ON_STATUS or status == NOTE_OFF_STATUS:
+        return TRAFFIC_IN_DRUM_PADS
+    elif midi_bytes[0] == 240:
+        return TRAFFIC_IN_HANDSHAKE
+    return TRAFFIC_IN_OTHER
+
+
+class TrafficCounters():
+    """Counts the MIDI messages and bytes sent and received, per category (see
+    TRAFFIC_CATEGORY_NAMES). roll() is called every TRAFFIC_RATE_INTERVAL ticks and
+    turns the counts since the last roll into per second rates, and keeps the peaks.
+    Counting a message is a table lookup and four increments. Received messages
+    are counted by wrapping receive_midi, so nothing is counted (and nothing is
+    spent on it) until the counters are enabled.
+    """
+
+    def __init__(self):
+        num_categories = len(TRAFFIC_CATEGORY_NAMES)
+        self.__messages = [ 0 for x in range(num_categories) ]
+        self.__bytes = [ 0 for x in range(num_categories) ]
+        self.__window_messages = [ 0 for x in range(num_categories) ]
+        self.__window_bytes = [ 0 for x in range(num_categories) ]
+        self.__message_rates = [ 0.0 for x in range(num_categories) ]
+        self.__byte_rates = [ 0.0 for x in range(num_categories) ]
+        self.__peak_message_rates = [ 0.0 for x in range(num_categories) ]
+        self.__peak_byte_rates = [ 0.0 for x in range(num_categories) ]
+        self.__window_start = time.time()
+
+    def wrap_receive_midi(self, receive_midi):
+        count_received = self.count_received
+
+        def counted_receive_midi(midi_bytes):
+            count_received(midi_bytes)
+            receive_midi(midi_bytes)
+
+        return counted_receive_midi
+
+    def count_sent(self, midi_bytes, lane = None):
+        """The transport LEDs share their CCs with the second button row, so they are
+        told apart by the output lane they were sent from
+        """
+        if midi_bytes[0] == 240:
+            if len(midi_bytes) > SYSEX_COMMAND_POS and midi_bytes[SYSEX_COMMAND_POS] == SYSEX_DISPLAY_COMMAND:
+                self.__count(TRAFFIC_OUT_DISPLAY, len(midi_bytes))
+            else:
+                self.__count(TRAFFIC_OUT_HANDSHAKE, len(midi_bytes))
+        elif lane == OUTPUT_LANE_TRANSPORT:
+            self.__count(TRAFFIC_OUT_TRANSPORT_LED, len(midi_bytes))
+        elif midi_bytes[0] & 240 == CC_STATUS:
+            self.__count(OUT_CC_CATEGORIES[midi_bytes[1]], len(midi_bytes))
+        else:
+            self.__count(TRAFFIC_OUT_OTHER, len(midi_bytes))
+
+    def count_received(self, midi_bytes):
+        self.__count(received_category(midi_bytes), len(midi_bytes))
+
+    def roll(self):
+        now = time.time()
+        seconds = now - self.__window_start
+        if seconds <= 0.0:
+            return
+        self.__window_start = now
+        for category in range(len(TRAFFIC_CATEGORY_NAMES)):
+            message_rate = self.__window_messages[category] / seconds
+            byte_rate = self.__window_bytes[category] / seconds
+            self.__message_rates[category] = message_rate
+            self.__byte_rates[category] = byte_rate
+            if message_rate > self.__peak_message_rates[category]:
+                self.__peak_message_rates[category] = message_rate
+            if byte_rate > self.__peak_byte_rates[category]:
+                self.__peak_byte_rates[category] = byte_rate
+            self.__window_messages[category] = 0
+            self.__window_bytes[category] = 0
+
+    def counters(self):
+        """Returns {category name: (messages, bytes, messages/s, bytes/s, peak messages/s,
+        peak bytes/s)} of the categories that had any traffic
+        """
+        counters = {}
+        for category, name in enumerate(TRAFFIC_CATEGORY_NAMES):
+            if self.__messages[category]:
+                counters[name] = (self.__messages[category],
+                 self.__bytes[category],
+                 self.__message_rates[category],
+                 self.__byte_rates[category],
+                 self.__peak_message_rates[category],
+                 self.__peak_byte_rates[category])
+        return counters
+
+    def dump(self, log_function, reason):
+        log_function('ZeRO_SLMkII MIDI traffic (%s):' % reason)
+        counters = self.counters()
+        for name in TRAFFIC_CATEGORY_NAMES:
+            if name in counters:
+                log_function('  %s: %d messages, %d bytes, now %.1f msg/s %.0f B/s, peak %.1f msg/s %.0f B/s' % ((name,) + counters[name]))
+
+    def __count(self, category, num_bytes):
+        self.__messages[category] += 1
+        self.__bytes[category] += num_bytes
+        self.__window_messages[category] += 1
+        self.__window_bytes[category] += num_bytes
@@ -1,27 +1,86 @@
+import os
 import Live
 import MidiRemoteScript
 from MixerController import MixerController
 from DisplayController import DisplayController
+from OutputScheduler import OutputScheduler, lane_for_message
+from CoalescingQueue import CoalescingQueue
+from LedShadowRegister import LedShadowRegister
+from Logger import Logger
+from TickScheduler import TickScheduler
+from CallProfiler import CallProfiler
+from TrafficCounters import TrafficCounters
+from FeedbackTracer import FeedbackTracer
+from InputCoalescer import InputCoalescer, CONTINUOUS_CC_MODES
+from MidiCapture import MidiCapture, CAPTURE_DIRECTION_IN, CAPTURE_DIRECTION_TICK
+from MidiTransport import MidiTransport, LiveMidiBackend, RtMidiBackend, ThreadedMidiBackend
 from consts import *
 
 class ZeRO_SLMkII():
     def __init__(self, c_instance):
         self.__c_instance = c_instance
-        self.__c_instance.log_message("Setting up ZeRO_SLMkII.")
+        self.__logger = Logger(c_instance.log_message)
+        self.__logger.info("Setting up ZeRO_SLMkII.")
 
         self.__automap_has_control = False
+        direct_backend = RtMidiBackend(RTMIDI_OUTPUT_PORT)
+        if MIDI_WRITER_THREAD_ENABLED:
+            direct_backend = ThreadedMidiBackend(direct_backend)
+            direct_backend.set_dropped_message_listener(self.__on_message_dropped)
+        self.__transport = MidiTransport(LiveMidiBackend(c_instance), direct_backend)
+        self.__coalescing_queue = CoalescingQueue()
+        self.__output_scheduler = OutputScheduler()
+        self.__output_scheduler.set_dropped_message_listener(self.__on_message_dropped)
+        self.__led_shadow_register = LedShadowRegister()
+        self.__tick_scheduler = TickScheduler(self.__logger)
         self.__display_controller = DisplayController(self, c_instance)
         self.__mixer_controller = MixerController(self, self.__display_controller, c_instance)
         self.__components = [self.__mixer_controller, self.__display_controller]
-        self.__update_hardware_delay = -1
+        self.__cc_handlers = self.__mixer_controller.cc_handlers()
+        self.__input_coalescer = InputCoalescer()
+        self.__note_on_handlers = self.__mixer_controller.note_on_handlers()
+        self.__update_hardware_task = None
+        self.__capture = None
+        self.__profiler = None
+        self.__feedback_tracer = None
+        self.__traffic_counters = None
+        if TRAFFIC_COUNTERS_ENABLED:
+            self.enable_traffic_counters()
+        if PROFILING_ENABLED:
+            self.enable_profiling()
+        if FEEDBACK_TRACING_ENABLED:
+            self.enable_feedback_tracing()
+        if MIDI_CAPTURE_ENABLED:
+            self.start_capture(os.path.join(os.path.expanduser('~'), MIDI_CAPTURE_FILE))
 
     def disconnect(self):
         """Called right before we get disconnected from Live
         """
         for c in self.__components:
             c.disconnect()
+        self.__flush_coalesced_messages()
+        self.__output_scheduler.flush_all()
         self.send_midi(ALL_LEDS_OFF_MESSAGE)
         self.send_midi(GOOD_BYE_SYSEX_MESSAGE)
+        self.__flush_coalesced_messages()
+        self.__output_scheduler.flush_all()
+        self.__transport.close()
+        self.stop_capture()
+        self.__logger.dump('disconnect')
+        if self.__profiler is not None:
+            self.__profiler.dump(self.__c_instance.log_message, 'disconnect')
+        if self.__feedback_tracer is not None:
+            self.__feedback_tracer.dump(self.__c_instance.log_message, 'disconnect')
+
+    def logger(self):
+        """The Logger all components log through
+        """
+        return self.__logger
+
+    def tick_scheduler(self):
+        """The TickScheduler components schedule their timed work in
+        """
+        return self.__tick_scheduler
 
     def song(self):
         """returns a reference to the Live song instance that we do control
@@ -56,22 +115,121 @@ class ZeRO_SLMkII():
         """
         self.__c_instance.request_rebuild_midi_map()
 
-    def send_midi(self, midi_event_bytes):
+    def send_midi(self, midi_event_bytes, direct = False, lane = None):
         """Use this function to send MIDI events through Live to the _real_ MIDI devices
         that this script is assigned to.
+        Channel messages are collected until the next flush, at the end of receive_midi
+        or update_display, and only the last value per (status, data1) is sent.
+        Everything is sent through the output scheduler. 'direct' messages bypass Live
+        and go to the direct backend of the transport (rtmidi). 'lane' is the output
+        scheduler lane, by default it is chosen by the message type.
+        LED messages that wouldn't change the LED are filtered out by the shadow register.
         """
-        if not self.__automap_has_control:
-            self.__c_instance.send_midi(midi_event_bytes)
+        if not direct and self.__automap_has_control:
+            return
+        if len(midi_event_bytes) == 3 and midi_event_bytes[0] < 240:
+            self.__coalescing_queue.put(midi_event_bytes, direct, lane)
+        else:
+            if lane_for_message(midi_event_bytes) != OUTPUT_LANE_DISPLAY:
+                self.__flush_coalesced_messages()
+            self.__schedule_midi(midi_event_bytes, direct, lane)
+
+    def __schedule_midi(self, midi_event_bytes, direct, lane):
+        if not self.__led_shadow_register.should_send(midi_event_bytes):
+            return
+        if direct:
+            self.__output_scheduler.enqueue(midi_event_bytes, self.__transport.send_direct, lane)
+        else:
+            self.__output_scheduler.enqueue(midi_event_bytes, self.__transport.send, lane)
+
+    def __on_message_dropped(self, midi_event_bytes):
+        """The output scheduler or the MIDI writer had to throw the message away, so
+        the display rows are sent completely with the next update, and the next
+        write of the LED is not filtered by the shadow register
+        """
+        if lane_for_message(midi_event_bytes) == OUTPUT_LANE_DISPLAY:
+            self.__display_controller.framebuffer().invalidate()
+        else:
+            self.__led_shadow_register.forget(midi_event_bytes)
+
+    def __flush_coalesced_messages(self):
+        if len(self.__coalescing_queue):
+            for midi_event_bytes, direct, lane in self.__coalescing_queue.take_all():
+                self.__schedule_midi(midi_event_bytes, direct, lane)
+
+    def __flush_output(self):
+        self.__flush_coalesced_messages()
+        self.__output_scheduler.flush()
+
+    def transport(self):
+        """The MidiTransport all output goes through, its backends can be replaced
+        """
+        return self.__transport
+
+    def start_capture(self, file_name):
+        """Records all received and sent MIDI messages and the timer ticks into
+        'file_name' (see MidiCapture), until stop_capture is called
+        """
+        self.stop_capture()
+        self.__capture = MidiCapture(file_name)
+        self.__transport.set_capture(self.__capture)
+        self.__logger.info('Capturing MIDI to %s', file_name)
+
+    def stop_capture(self):
+        if self.__capture is not None:
+            self.__transport.set_capture(None)
+            self.__capture.close()
+            self.__logger.info('Captured %d MIDI events', self.__capture.recorded_events())
+            self.__capture = None
+
+    def output_counters(self):
+        """Returns the sent, deferred and dropped message counters of the output scheduler,
+        how many messages have been coalesced and the counters of the transport backends
+        """
+        counters = self.__output_scheduler.counters()
+        counters.update(self.__transport.counters())
+        counters['coalesced_messages'] = self.__coalescing_queue.counters()['coalesced_messages']
+        return counters
+
+    def enable_traffic_counters(self):
+        """Counts the MIDI messages and bytes sent and received per category (see
+        TrafficCounters), read them with traffic_counters or dump_traffic.
+        """
+        if self.__traffic_counters is None:
+            self.__traffic_counters = TrafficCounters()
+            self.receive_midi = self.__traffic_counters.wrap_receive_midi(self.receive_midi)
+            self.__transport.set_traffic_counters(self.__traffic_counters)
+            self.__tick_scheduler.schedule_repeating(TRAFFIC_RATE_INTERVAL, self.__traffic_counters.roll, 'traffic rates')
+
+    def traffic_counters(self):
+        """Returns the messages, bytes and rates sent and received per category, see
+        TrafficCounters.counters (only counted after enable_traffic_counters)
+        """
+        if self.__traffic_counters is None:
+            return {}
+        return self.__traffic_counters.counters()
+
+    def dump_traffic(self):
+        """Writes the traffic counters to the log (only counted after
+        enable_traffic_counters)
+        """
+        if self.__traffic_counters is not None:
+            self.__traffic_counters.dump(self.__c_instance.log_message, 'requested')
 
     def refresh_state(self):
         """Send out MIDI to completely update the attached MIDI controller.
         Will be called when requested by the user, after for example having reconnected
         the MIDI cables...
         """
-        self.__update_hardware_delay = 5
+        self.__led_shadow_register.invalidate()
+        self.__input_coalescer.reset()
+        self.__tick_scheduler.cancel(self.__update_hardware_task)
+        self.__update_hardware_task = self.__tick_scheduler.schedule(5, self.__update_hardware)
 
     def __update_hardware(self):
+        self.__update_hardware_task = None
         self.__automap_has_control = False
+        self.__led_shadow_register.invalidate()
         self.send_midi(WELCOME_SYSEX_MESSAGE)
         for c in self.__components:
             c.refresh_state()
@@ -92,35 +250,87 @@ class ZeRO_SLMkII():
         """Aka on_timer. Called every 100 ms and should be used to update display relevant
         parts of the controller only...
         """
-        if self.__update_hardware_delay > 0:
-            self.__update_hardware_delay -= 1
-            if self.__update_hardware_delay == 0:
-                self.__update_hardware()
-                self.__update_hardware_delay = -1
+        if self.__capture is not None:
+            self.__capture.record(CAPTURE_DIRECTION_TICK)
+        self.__output_scheduler.begin_tick()
+        self.__input_coalescer.flush()
+        self.__tick_scheduler.tick()
         for c in self.__components:
             c.update_display()
+        self.__flush_output()
 
     def receive_midi(self, midi_bytes):
         """MIDI messages are only received through this function, when explicitly
         forwarded in 'build_midi_map'.
         """
+        if self.__logger.tracing:
+            self.__logger.trace('received midi', midi_bytes)
+        if self.__capture is not None:
+            self.__capture.record(CAPTURE_DIRECTION_IN, midi_bytes)
+        try:
+            self.__receive_midi(midi_bytes)
+        except Exception:
+            self.__logger.dump('error')
+            raise
+        self.__flush_output()
 
-        self.__c_instance.log_message("received midi: " + str(midi_bytes))
+    def enable_profiling(self):
+        """Measures the latencies of the callbacks from Live and of the strip reassignment
+        (see CallProfiler). The summary is written to the log on disconnect, or with
+        dump_profile.
+        """
+        if self.__profiler is None:
+            self.__profiler = CallProfiler()
+            for name in ('receive_midi', 'update_display', 'build_midi_map', 'refresh_state'):
+                setattr(self, name, self.__profiler.wrap(name, getattr(self, name)))
+            self.__mixer_controller.set_profiler(self.__profiler)
+
+    def dump_profile(self):
+        """Writes the latency summary to the log (only recorded after enable_profiling)
+        """
+        if self.__profiler is not None:
+            self.__profiler.dump(self.__c_instance.log_message, 'requested')
+
+    def enable_feedback_tracing(self):
+        """Measures the time from received messages to the messages sent in response,
+        per control type (see FeedbackTracer). The summary is written to the log on
+        disconnect, or with dump_feedback_latency.
+        """
+        if self.__feedback_tracer is None:
+            self.__feedback_tracer = FeedbackTracer()
+            self.receive_midi = self.__feedback_tracer.wrap_receive_midi(self.receive_midi)
+            self.update_display = self.__feedback_tracer.wrap_update_display(self.update_display)
+            self.__transport.set_feedback_tracer(self.__feedback_tracer)
+
+    def dump_feedback_latency(self):
+        """Writes the input to feedback latencies to the log (only recorded after
+        enable_feedback_tracing)
+        """
+        if self.__feedback_tracer is not None:
+            self.__feedback_tracer.dump(self.__c_instance.log_message, 'requested')
+
+    def dump_log(self):
+        """Writes the recent trace events to the log (only recorded with LOG_LEVEL_DEBUG)
+        """
+        self.__logger.dump('requested')
 
-        if midi_bytes[0] & 240 in (NOTE_ON_STATUS, NOTE_OFF_STATUS):
-            channel = midi_bytes[0] & 15
-            note = midi_bytes[1]
-            velocity = midi_bytes[2]
-            if note in fx_notes:
-                 self.__mixer_controller.receive_midi_note(note, velocity, midi_bytes[0] & 240)
-        elif midi_bytes[0] & 240 == CC_STATUS:
-            channel = midi_bytes[0] & 15
+    def __receive_midi(self, midi_bytes):
+        status = midi_bytes[0] & 240
+        if status == CC_STATUS:
             cc_no = midi_bytes[1]
-            cc_value = midi_bytes[2]
-            if cc_no in mx_ccs or cc_no in fx_ccs:
-                self.__mixer_controller.receive_midi_cc(cc_no, cc_value)
+            handler = self.__cc_handlers[cc_no]
+            if not handler:
+                self.__logger.sampled(LOG_LEVEL_WARNING, 'err2', 'err2: unknown MIDI message %s', midi_bytes)
+            elif CONTINUOUS_CC_MODES[cc_no] is None:
+                handler[0](handler[1], midi_bytes[2])
             else:
-                print 'err2: unknown MIDI message %s' % str(midi_bytes)
+                self.__input_coalescer.put(midi_bytes[0] & 15, cc_no, midi_bytes[2], handler)
+        elif status == NOTE_ON_STATUS:
+            handler = self.__note_on_handlers[midi_bytes[1]]
+            if handler:
+                handler[0](handler[1], midi_bytes[2])
+        elif status == NOTE_OFF_STATUS:
+            pass
         elif midi_bytes[0] == 240:
             if len(midi_bytes) == 13 and midi_bytes[1:4] == (0, 32, 41):
                 if midi_bytes[8] == ABLETON_PID and midi_bytes[10] == 1:
@@ -132,4 +342,4 @@ class ZeRO_SLMkII():
 
                     self.request_rebuild_midi_map()
         else:
-            print 'err3: unknown MIDI message %s' % str(midi_bytes)
\ No newline at end of file
+            self.__logger.sampled(LOG_LEVEL_WARNING, 'err3', 'err3: unknown MIDI message %s', midi_bytes)
\ No newline at end of file
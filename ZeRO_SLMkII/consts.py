@@ -8,7 +8,7 @@ SL_MIDI_CHANNEL = 0
 CC_VAL_BUTTON_PRESSED = 1
 CC_VAL_BUTTON_RELEASED = 0
 ABLETON_PID = 4
-WELCOME_SYSEX_MESSAGE = (240,
+SYSEX_HEADER = (240,
  0,
  32,
  41,
@@ -17,26 +17,67 @@ WELCOME_SYSEX_MESSAGE = (240,
  18,
  0,
  ABLETON_PID,
- 0,
- 1,
- 1,
- 247)
-GOOD_BYE_SYSEX_MESSAGE = (240,
- 0,
- 32,
- 41,
- 3,
- 3,
- 18,
- 0,
- ABLETON_PID,
- 0,
- 1,
- 0,
- 247)
-ALL_LEDS_OFF_MESSAGE = (CC_STATUS + SL_MIDI_CHANNEL, 78, 0)
+ 0)
+SYSEX_END = 247
+SYSEX_HANDSHAKE_COMMAND = 1
+SYSEX_DISPLAY_COMMAND = 2
+SYSEX_COMMAND_POS = len(SYSEX_HEADER)
+DISPLAY_TEXT_COMMAND = (SYSEX_DISPLAY_COMMAND, 1)
+DISPLAY_CLEAR_COMMAND = (SYSEX_DISPLAY_COMMAND, 2)
+DISPLAY_WRITE_TEXT = 4
+DISPLAY_CLEAR_LEFT = 4
+DISPLAY_CLEAR_RIGHT = 5
+WELCOME_SYSEX_MESSAGE = SYSEX_HEADER + (SYSEX_HANDSHAKE_COMMAND, 1, SYSEX_END)
+GOOD_BYE_SYSEX_MESSAGE = SYSEX_HEADER + (SYSEX_HANDSHAKE_COMMAND, 0, SYSEX_END)
+ALL_LEDS_OFF_CC = 78
+ALL_LEDS_OFF_MESSAGE = (CC_STATUS + SL_MIDI_CHANNEL, ALL_LEDS_OFF_CC, 0)
 NUM_CHARS_PER_DISPLAY_STRIP = 9
 NUM_CHARS_PER_DISPLAY_LINE = NUM_CHARS_PER_DISPLAY_STRIP * NUM_CONTROLS_PER_ROW
+DISPLAY_STRING_CACHE_SIZE = 256
+DISPLAY_LEFT_UPPER_ROW = 1
+DISPLAY_RIGHT_UPPER_ROW = 2
+DISPLAY_LEFT_LOWER_ROW = 3
+DISPLAY_RIGHT_LOWER_ROW = 4
+DISPLAY_ROW_IDS = (DISPLAY_LEFT_UPPER_ROW,
+ DISPLAY_RIGHT_UPPER_ROW,
+ DISPLAY_LEFT_LOWER_ROW,
+ DISPLAY_RIGHT_LOWER_ROW)
+DISPLAY_SPAN_MERGE_GAP = 16
+DISPLAY_VALUE_UPDATE_INTERVAL = 2
+DISPLAY_MARQUEE_ENABLED = False
+DISPLAY_MARQUEE_INTERVAL = 3
+DISPLAY_MARQUEE_HOLD_FRAMES = 4
+DISPLAY_MARQUEE_GAP = 3
+OUTPUT_LANE_LED = 0
+OUTPUT_LANE_TRANSPORT = 1
+OUTPUT_LANE_DISPLAY = 2
+OUTPUT_LANES = (OUTPUT_LANE_LED, OUTPUT_LANE_TRANSPORT, OUTPUT_LANE_DISPLAY)
+OUTPUT_BYTES_PER_TICK = 320
+OUTPUT_MAX_QUEUED_MESSAGES = 256
+RTMIDI_OUTPUT_PORT = 0
+MIDI_WRITER_THREAD_ENABLED = False
+MIDI_WRITER_MAX_QUEUED_MESSAGES = 1024
+MIDI_WRITER_CLOSE_TIMEOUT = 1.0
+LOG_LEVEL_DEBUG = 10
+LOG_LEVEL_INFO = 20
+LOG_LEVEL_WARNING = 30
+LOG_LEVEL_ERROR = 40
+LOG_LEVEL = LOG_LEVEL_INFO
+LOG_RING_BUFFER_SIZE = 256
+LOG_SAMPLE_INTERVAL = 100
+MIDI_CAPTURE_ENABLED = False
+MIDI_CAPTURE_FILE = 'ZeRO_SLMkII_capture.zslc'
+MIDI_CAPTURE_BUFFER_SIZE = 65536
+TICK_WHEEL_SIZE = 64
+PROFILING_ENABLED = False
+PROFILE_NUM_BUCKETS = 25
+TRAFFIC_COUNTERS_ENABLED = False
+TRAFFIC_RATE_INTERVAL = 10
+FEEDBACK_TRACING_ENABLED = False
+INPUT_MODE_ABSOLUTE = 0
+INPUT_MODE_RELATIVE = 1
+INPUT_DEADBAND = 1
+INPUT_JITTER_THRESHOLD = 2
 
 def __create_row_range(cc_base):
     return range(cc_base, cc_base + NUM_CONTROLS_PER_ROW)
@@ -56,6 +97,7 @@ FX_ENCODER_ROW_BASE_CC = 56
 fx_encoder_row_ccs = __create_row_range(FX_ENCODER_ROW_BASE_CC)
 FX_ENCODER_FEEDBACK_BASE_CC = 112
 fx_encoder_feedback_ccs = __create_row_range(FX_ENCODER_FEEDBACK_BASE_CC)
+fx_encoder_feedback_cc_value_map = tuple([ int(1.5 + float(index) / 127.0 * 10.0) for index in range(128) ])
 FX_ENCODER_LED_MODE_BASE_CC = 120
 fx_encoder_led_mode_ccs = __create_row_range(FX_ENCODER_LED_MODE_BASE_CC)
 FX_LOWER_BUTTON_ROW_BASE_CC = 32
@@ -93,7 +135,18 @@ ts_ccs = [TS_REWIND_CC,
  TS_RECORD_CC,
  TS_LOOP_CC,
  TS_LOCK]
+TS_STOP_LED_CC = 50
+TS_PLAY_LED_CC = 51
+TS_LOOP_LED_CC = 52
+TS_RECORD_LED_CC = 53
+TS_LOCK_ENQUIRY_CC = 103
+ts_feedback_ccs = [TS_STOP_LED_CC,
+ TS_PLAY_LED_CC,
+ TS_LOOP_LED_CC,
+ TS_RECORD_LED_CC,
+ TS_LOCK_ENQUIRY_CC]
 ts_notes = []
+led_command_ccs = frozenset([ALL_LEDS_OFF_CC, TS_LOCK_ENQUIRY_CC])
 mx_ccs = mx_display_button_ccs + mx_select_button_ccs + mx_first_button_row_ccs + mx_second_button_row_ccs + mx_slider_row_ccs + ts_ccs
 mx_notes = []
 mx_forwarded_ccs = mx_display_button_ccs + mx_select_button_ccs + mx_first_button_row_ccs + mx_second_button_row_ccs + fx_upper_button_row_ccs + fx_lower_button_row_ccs
@@ -115,6 +168,6 @@ CA_TAP = 37
 CA_SAVE = 38
 CA_ADD_AUDIO_TRACK = 39 
 CA_ADD_RETURN_TRACK = 40
-CA_UNDEFINED = 41
+CA_CLEAR_SOLOS_AND_ARMS = 41
 CA_UNDO = 42
 CA_ADD_MIDI_TRACK = 43
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""Benchmark of the MIDI input routing: messages per second through
+ZeRO_SLMkII.receive_midi, using the fake Live objects of fake_live.
+
+The messages are button releases, slider moves and pad note offs, which are
+routed to their handlers but don't change the song, so mostly the routing
+itself is measured. The routing alone is also compared with the list membership
+tests and if/elif chains that receive_midi and MixerController.receive_midi_cc
+used before the dispatch tables, both calling the same empty handlers.
+Run it with the Python 2.7 interpreter Live uses:
+
+    python benchmarks/bench_receive_midi.py
+"""
+import time
+import timeit
+
+import fake_live
+fake_live.install()
+
+from consts import *
+from MidiTransport import NullMidiBackend
+from ZeRO_SLMkII import ZeRO_SLMkII
+
+NUM_ROUNDS = 2000
+NUM_ROUTING_RUNS = 500
+
+
+def create_script(num_tracks = 64):
+    song = fake_live.Song(num_tracks)
+    c_instance = fake_live.CInstance(song)
+    script = ZeRO_SLMkII(c_instance)
+    script.transport().set_backend(NullMidiBackend())
+    script.transport().set_direct_backend(NullMidiBackend())
+    return script, c_instance
+
+
+def input_messages():
+    cc_status = CC_STATUS + SL_MIDI_CHANNEL
+    messages = []
+    for index in range(NUM_CONTROLS_PER_ROW):
+        messages.append((cc_status, mx_slider_row_ccs[index], 64))
+        messages.append((cc_status, mx_first_button_row_ccs[index], CC_VAL_BUTTON_RELEASED))
+        messages.append((cc_status, mx_second_button_row_ccs[index], CC_VAL_BUTTON_RELEASED))
+        messages.append((cc_status, fx_upper_button_row_ccs[index], CC_VAL_BUTTON_RELEASED))
+        messages.append((cc_status, fx_lower_button_row_ccs[index], CC_VAL_BUTTON_RELEASED))
+        messages.append((NOTE_OFF_STATUS + SL_MIDI_CHANNEL, fx_drum_pad_row_notes[index], 0))
+    messages.append((cc_status, MX_DISPLAY_PAGE_UP, CC_VAL_BUTTON_RELEASED))
+    messages.append((cc_status, MX_DISPLAY_PAGE_DOWN, CC_VAL_BUTTON_RELEASED))
+    messages.append((cc_status, TS_REWIND_CC, CC_VAL_BUTTON_RELEASED))
+    messages.append((cc_status, TS_FORWARD_CC, CC_VAL_BUTTON_RELEASED))
+    return messages
+
+
+def ignore(argument, value):
+    pass
+
+
+def list_membership_route(midi_bytes):
+    """The former routing of receive_midi and MixerController.receive_midi_cc/
+    receive_midi_note, with the strip and transport calls replaced by ignore."""
+    if midi_bytes[0] & 240 in (NOTE_ON_STATUS, NOTE_OFF_STATUS):
+        note = midi_bytes[1]
+        velocity = midi_bytes[2]
+        if note in fx_notes and midi_bytes[0] & 240 == NOTE_ON_STATUS:
+            ignore(note, velocity)
+    elif midi_bytes[0] & 240 == CC_STATUS:
+        cc_no = midi_bytes[1]
+        cc_value = midi_bytes[2]
+        if cc_no in mx_ccs or cc_no in fx_ccs:
+            if cc_no in ts_ccs:
+                ignore(cc_no, cc_value)
+            elif cc_no in mx_slider_row_ccs:
+                ignore(cc_no - MX_SLIDER_ROW_BASE_CC, cc_value)
+            elif cc_no in mx_first_button_row_ccs:
+                ignore(cc_no - MX_FIRST_BUTTON_ROW_BASE_CC, cc_value)
+            elif cc_no in mx_second_button_row_ccs:
+                ignore(cc_no - MX_SECOND_BUTTON_ROW_BASE_CC, cc_value)
+            elif cc_no in fx_upper_button_row_ccs:
+                ignore(cc_no - FX_UPPER_BUTTON_ROW_BASE_CC, cc_value)
+            elif cc_no in fx_lower_button_row_ccs:
+                ignore(cc_no - FX_LOWER_BUTTON_ROW_BASE_CC, cc_value)
+            elif cc_no in mx_display_button_ccs:
+                ignore(cc_no, cc_value)
+
+
+def dispatch_table_router():
+    """The routing of receive_midi, through dispatch tables laid out like the ones
+    of MixerController, with all handlers replaced by ignore."""
+    cc_handlers = [ None for cc_no in range(NUM_CC_NO + 1) ]
+    for row_ccs in (mx_slider_row_ccs, fx_encoder_row_ccs, fx_poti_row_ccs, mx_first_button_row_ccs, mx_second_button_row_ccs, fx_upper_button_row_ccs, fx_lower_button_row_ccs):
+        for strip_index in range(NUM_CONTROLS_PER_ROW):
+            cc_handlers[row_ccs[strip_index]] = (ignore, strip_index)
+    for cc_no in ts_ccs + mx_display_button_ccs:
+        cc_handlers[cc_no] = (ignore, cc_no)
+    note_on_handlers = [ None for note in range(NUM_CC_NO + 1) ]
+    for note in fx_notes:
+        note_on_handlers[note] = (ignore, note)
+
+    def dispatch_table_route(midi_bytes):
+        status = midi_bytes[0] & 240
+        if status == CC_STATUS:
+            handler = cc_handlers[midi_bytes[1]]
+            if handler:
+                handler[0](handler[1], midi_bytes[2])
+        elif status == NOTE_ON_STATUS:
+            handler = note_on_handlers[midi_bytes[1]]
+            if handler:
+                handler[0](handler[1], midi_bytes[2])
+
+    return dispatch_table_route
+
+
+def run_routing(name, route, messages):
+    seconds = min(timeit.repeat(lambda: [ route(midi_bytes) for midi_bytes in messages ], number=NUM_ROUTING_RUNS, repeat=3))
+    print '  %-20s %8.3f us/message' % (name, seconds / (NUM_ROUTING_RUNS * len(messages)) * 1000000.0)
+    return seconds
+
+
+def main():
+    script, c_instance = create_script()
+    messages = input_messages()
+    receive_midi = script.receive_midi
+    best = None
+    for repeat in range(3):
+        del c_instance.log_messages[:]
+        start = time.time()
+        for round in range(NUM_ROUNDS):
+            for midi_bytes in messages:
+                receive_midi(midi_bytes)
+        seconds = time.time() - start
+        if best is None or seconds < best:
+            best = seconds
+    num_messages = NUM_ROUNDS * len(messages)
+    print 'receive_midi: %d messages in %.3f s' % (num_messages, best)
+    print '  %.0f messages/s, %.2f us/message' % (num_messages / best, best / num_messages * 1000000.0)
+    print 'routing only'
+    old = run_routing('list membership', list_membership_route, messages)
+    new = run_routing('dispatch tables', dispatch_table_router(), messages)
+    print '  speedup %.1fx' % (old / new)
+
+
+if __name__ == '__main__':
+    main()
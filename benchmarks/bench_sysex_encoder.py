@@ -0,0 +1,67 @@
+"""Microbenchmark of the display sysex encoding.
+
+Compares the tuple concatenation that DisplayController used to build display
+messages with the precompiled templates of SysexEncoder.
+Run it with the Python 2.7 interpreter Live uses:
+
+    python benchmarks/bench_sysex_encoder.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'ZeRO_SLMkII'))
+
+from consts import *
+from SysexEncoder import SysexEncoder
+
+NUM_RUNS = 20000
+FULL_ROW = ('  Drums    Bass    Keys    Lead    Pad     Vox     FX     Master ' + ' ' * NUM_CHARS_PER_DISPLAY_LINE)[0:NUM_CHARS_PER_DISPLAY_LINE]
+ONE_STRIP = ' Keys    '
+
+
+def tuple_display_string_message(message, row_id, offset = 0):
+    """The former DisplayController.__send_display_string message building."""
+    final_message = message[0:NUM_CHARS_PER_DISPLAY_LINE - offset]
+    sysex_header = (240,
+     0,
+     32,
+     41,
+     3,
+     3,
+     18,
+     0,
+     ABLETON_PID,
+     0,
+     2,
+     1)
+    sysex_pos = (offset, row_id)
+    sysex_text_command = (4,)
+    sysex_text = tuple([ ord(c) for c in final_message ])
+    sysex_close_up = (247,)
+    return sysex_header + sysex_pos + sysex_text_command + sysex_text + sysex_close_up
+
+
+def run(name, function):
+    seconds = min(timeit.repeat(function, number=NUM_RUNS, repeat=3))
+    print '%-28s %8.3f us/message' % (name, seconds / NUM_RUNS * 1000000.0)
+    return seconds
+
+
+def main():
+    encoder = SysexEncoder()
+    for text, offset in ((FULL_ROW, 0), (ONE_STRIP, 18)):
+        assert tuple_display_string_message(text, 1, offset) == encoder.display_string_message(text, 1, offset)
+
+    print 'full row (%d chars)' % NUM_CHARS_PER_DISPLAY_LINE
+    old = run('  tuple concatenation', lambda: tuple_display_string_message(FULL_ROW, 1))
+    new = run('  SysexEncoder', lambda: encoder.display_string_message(FULL_ROW, 1))
+    print '  speedup %.1fx' % (old / new)
+    print 'one strip (%d chars)' % NUM_CHARS_PER_DISPLAY_STRIP
+    old = run('  tuple concatenation', lambda: tuple_display_string_message(ONE_STRIP, 1, 18))
+    new = run('  SysexEncoder', lambda: encoder.display_string_message(ONE_STRIP, 1, 18))
+    print '  speedup %.1fx' % (old / new)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""Stand-ins for the parts of Live's Python API the script uses, so it can be
+driven outside of Live by the benchmarks.
+
+install() registers the fake 'Live', 'MidiRemoteScript' and '_Framework.Capabilities'
+modules and puts the script folder on the path, so the script modules can be
+imported the way Live imports them.
+"""
+import os
+import sys
+import types
+
+SCRIPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'ZeRO_SLMkII')
+
+
+class ListenerHost(object):
+    """Implements add_<property>_listener, remove_<property>_listener and
+    <property>_has_listener for every property, like Live objects do.
+    """
+    __next_live_ptr = [1]
+
+    def __init__(self):
+        self._listeners = {}
+        self._live_ptr = ListenerHost.__next_live_ptr[0]
+        ListenerHost.__next_live_ptr[0] += 1
+
+    def __getattr__(self, name):
+        if name.startswith('add_') and name.endswith('_listener'):
+            return lambda listener: self._listeners.setdefault(name[4:-9], []).append(listener)
+        if name.startswith('remove_') and name.endswith('_listener'):
+            return lambda listener: self._listeners[name[7:-9]].remove(listener)
+        if name.endswith('_has_listener'):
+            return lambda listener: listener in self._listeners.get(name[:-13], ())
+        raise AttributeError(name)
+
+    def listener_count(self):
+        return sum([ len(listeners) for listeners in self._listeners.values() ])
+
+    def _notify(self, name):
+        for listener in list(self._listeners.get(name, ())):
+            listener()
+
+
+def observable(name, default = None):
+    """A property that notifies its listeners when the value changes"""
+    attribute = '_' + name
+
+    def getter(self):
+        return getattr(self, attribute, default)
+
+    def setter(self, value):
+        if getattr(self, attribute, default) != value:
+            setattr(self, attribute, value)
+            self._notify(name)
+
+    return property(getter, setter)
+
+
+class DeviceParameter(ListenerHost):
+    value = observable('value', 0.0)
+
+    def __init__(self, name, value = 0.85, min = 0.0, max = 1.0):
+        ListenerHost.__init__(self)
+        self.name = name
+        self._value = value
+        self.min = min
+        self.max = max
+
+    def __unicode__(self):
+        return u'%.1f dB' % ((self.value - 0.85) * 40.0)
+
+    def __str__(self):
+        return str(unicode(self))
+
+
+class MixerDevice(object):
+
+    def __init__(self, num_sends):
+        self.volume = DeviceParameter('Track Volume')
+        self.panning = DeviceParameter('Track Panning', 0.0, -1.0, 1.0)
+        self.sends = [ DeviceParameter('Send %d' % (index + 1), 0.0) for index in range(num_sends) ]
+
+
+class TrackView(object):
+
+    def select_instrument(self):
+        return True
+
+
+class ClipSlot(ListenerHost):
+    has_clip = observable('has_clip', False)
+
+    def __init__(self, has_clip = False):
+        ListenerHost.__init__(self)
+        self._has_clip = has_clip
+
+
+class Track(ListenerHost):
+    name = observable('name', '')
+    mute = observable('mute', False)
+    solo = observable('solo', False)
+    arm = observable('arm', False)
+    fired_slot_index = observable('fired_slot_index', -1)
+    playing_slot_index = observable('playing_slot_index', -1)
+
+    def __init__(self, name, can_be_armed = True, num_sends = 0, num_clip_slots = 0, num_clips = 0):
+        ListenerHost.__init__(self)
+        self._name = name
+        self.can_be_armed = can_be_armed
+        self.mixer_device = MixerDevice(num_sends)
+        self.clip_slots = [ ClipSlot(index < num_clips) for index in range(num_clip_slots) ]
+        self.view = TrackView()
+
+    def fire_clip(self, slot_index):
+        """Launches the clip of the slot and lets it play right away"""
+        if self.clip_slots[slot_index].has_clip:
+            self.fired_slot_index = slot_index
+            self.playing_slot_index = slot_index
+            self.fired_slot_index = -1
+
+    def stop_all_clips(self):
+        if self.playing_slot_index >= 0:
+            self.fired_slot_index = -2
+
+    def clips_stopped(self):
+        """Ends a pending stop, like Live does at the next quantization point"""
+        if self.fired_slot_index == -2:
+            self.playing_slot_index = -1
+            self.fired_slot_index = -1
+
+
+class SongView(object):
+    selected_track = None
+
+
+class Song(ListenerHost):
+    """A song with 'num_tracks' tracks, 'num_returns' return tracks and the master.
+    Every track has one send per return track and 'num_clip_slots' clip slots, of
+    which the first 'num_clips' have a clip.
+    """
+    tracks = observable('tracks', ())
+    visible_tracks = observable('visible_tracks', ())
+    return_tracks = observable('return_tracks', ())
+    is_playing = observable('is_playing', False)
+    record_mode = observable('record_mode', False)
+    loop = observable('loop', False)
+    metronome = observable('metronome', False)
+
+    def __init__(self, num_tracks = 8, num_returns = 2, num_clip_slots = 8, num_clips = 0):
+        ListenerHost.__init__(self)
+        self.__num_returns = num_returns
+        self.__num_clip_slots = num_clip_slots
+        self.__num_clips = num_clips
+        self.master_track = Track('Master', False, 0)
+        self.exclusive_arm = True
+        self.exclusive_solo = True
+        self.can_undo = False
+        self.view = SongView()
+        self._tracks = tuple([ self.__create_track('%d Audio' % (index + 1)) for index in range(num_tracks) ])
+        self._visible_tracks = self._tracks
+        self._return_tracks = tuple([ Track('%s-Return' % chr(65 + index % 26), False, num_returns) for index in range(num_returns) ])
+
+    def __create_track(self, name):
+        return Track(name, True, self.__num_returns, self.__num_clip_slots, self.__num_clips)
+
+    def create_midi_track(self, index):
+        track = self.__create_track('%d MIDI' % (len(self._tracks) + 1))
+        if index < 0:
+            index = len(self._tracks)
+        tracks = self._tracks[:index] + (track,) + self._tracks[index:]
+        self._tracks = tracks
+        self._notify('tracks')
+        self.visible_tracks = tracks
+        return track
+
+    def create_audio_track(self, index):
+        return self.create_midi_track(index)
+
+    def create_return_track(self):
+        self.return_tracks = self._return_tracks + (Track('Return', False, 0),)
+
+    def delete_track(self, index):
+        tracks = self._tracks[:index] + self._tracks[index + 1:]
+        self._tracks = tracks
+        self._notify('tracks')
+        self.visible_tracks = tracks
+
+    def jump_by(self, beats):
+        pass
+
+    def tap_tempo(self):
+        pass
+
+    def undo(self):
+        pass
+
+    def start_playing(self):
+        self.is_playing = True
+
+    def stop_playing(self):
+        self.is_playing = False
+
+    def stop_all_clips(self):
+        for track in self._tracks:
+            track.stop_all_clips()
+
+
+class CInstance(object):
+    """The c_instance Live passes to create_instance. Everything sent through
+    Live is kept in 'sent_midi'.
+    """
+
+    def __init__(self, song):
+        self.__song = song
+        self.sent_midi = []
+        self.log_messages = []
+        self.rebuild_requests = 0
+        self.pad_translation = None
+
+    def song(self):
+        return self.__song
+
+    def send_midi(self, midi_bytes):
+        if not isinstance(midi_bytes, tuple):
+            raise TypeError('send_midi expects a tuple, got %r' % (midi_bytes,))
+        self.sent_midi.append(midi_bytes)
+
+    def log_message(self, message):
+        self.log_messages.append(message)
+
+    def show_message(self, message):
+        pass
+
+    def request_rebuild_midi_map(self):
+        self.rebuild_requests += 1
+
+    def handle(self):
+        return 1
+
+    def set_pad_translation(self, pad_translation):
+        self.pad_translation = pad_translation
+
+    def instance_identifier(self):
+        return 0
+
+
+class MidiMapModule(object):
+    """Live.MidiMap, counting the mappings of the last rebuild"""
+
+    class MapMode(object):
+        absolute = 0
+        relative_smooth_signed_bit = 1
+
+    class CCFeedbackRule(object):
+        pass
+
+    def __init__(self):
+        self.mapped_ccs = 0
+        self.forwarded_ccs = 0
+        self.forwarded_notes = 0
+
+    def map_midi_cc(self, midi_map_handle, parameter, channel, cc_no, map_mode, avoid_takeover):
+        self.mapped_ccs += 1
+
+    def map_midi_cc_with_feedback_map(self, midi_map_handle, parameter, channel, cc_no, map_mode, feedback_rule, avoid_takeover):
+        self.mapped_ccs += 1
+
+    def send_feedback_for_parameter(self, midi_map_handle, parameter):
+        pass
+
+    def forward_midi_cc(self, script_handle, midi_map_handle, channel, cc_no):
+        self.forwarded_ccs += 1
+
+    def forward_midi_note(self, script_handle, midi_map_handle, channel, note):
+        self.forwarded_notes += 1
+
+
+def install():
+    """Registers the fake modules, returns the fake Live module"""
+    if 'Live' in sys.modules and getattr(sys.modules['Live'], 'is_fake', False):
+        return sys.modules['Live']
+    live = types.ModuleType('Live')
+    live.is_fake = True
+    live.MidiMap = MidiMapModule()
+    sys.modules['Live'] = live
+    sys.modules['MidiRemoteScript'] = types.ModuleType('MidiRemoteScript')
+    framework = types.ModuleType('_Framework')
+    capabilities = types.ModuleType('_Framework.Capabilities')
+    framework.Capabilities = capabilities
+    sys.modules['_Framework'] = framework
+    sys.modules['_Framework.Capabilities'] = capabilities
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    return live
@@ -0,0 +1,82 @@
+"""Replays a MIDI capture (see MidiCapture) against the fake Live objects of
+fake_live: the received messages are fed into ZeRO_SLMkII.receive_midi and the
+timer ticks into update_display, at the original speed multiplied by --speed,
+or as fast as possible with --speed 0 (the default).
+
+At the end the script is disconnected and the number of replayed events, the time it took and the sent
+messages compared to the captured ones are printed:
+
+    python benchmarks/replay_capture.py capture.zslc --tracks 64 --speed 4
+"""
+import optparse
+import time
+from timeit import default_timer
+
+import fake_live
+fake_live.install()
+
+from consts import *
+from MidiCapture import read_capture, CAPTURE_DIRECTION_IN, CAPTURE_DIRECTION_OUT, CAPTURE_DIRECTION_OUT_DIRECT, CAPTURE_DIRECTION_TICK
+from MidiTransport import RecordingMidiBackend
+from ZeRO_SLMkII import ZeRO_SLMkII
+
+
+def create_script(num_tracks):
+    song = fake_live.Song(num_tracks)
+    c_instance = fake_live.CInstance(song)
+    script = ZeRO_SLMkII(c_instance)
+    backend = RecordingMidiBackend()
+    direct_backend = RecordingMidiBackend()
+    script.transport().set_backend(backend)
+    script.transport().set_direct_backend(direct_backend)
+    script.build_midi_map(0)
+    return script, backend, direct_backend
+
+
+def replay(script, events, speed = 0.0):
+    """Feeds the received messages and ticks of 'events' into the script, returns
+    the number of replayed events and the seconds the script spent on them
+    """
+    receive_midi = script.receive_midi
+    update_display = script.update_display
+    replayed_events = 0
+    busy_seconds = 0.0
+    start = default_timer()
+    for seconds, direction, midi_bytes in events:
+        if direction != CAPTURE_DIRECTION_IN and direction != CAPTURE_DIRECTION_TICK:
+            continue
+        if speed > 0.0:
+            delay = start + seconds / speed - default_timer()
+            if delay > 0.0:
+                time.sleep(delay)
+        event_start = default_timer()
+        if direction == CAPTURE_DIRECTION_IN:
+            receive_midi(midi_bytes)
+        else:
+            update_display()
+        busy_seconds += default_timer() - event_start
+        replayed_events += 1
+    return replayed_events, busy_seconds
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options] capture_file')
+    parser.add_option('--tracks', type='int', default=64, help='number of tracks of the fake song')
+    parser.add_option('--speed', type='float', default=0.0, help='replay speed, 0 is as fast as possible')
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error('expected one capture file')
+    start_time, events = read_capture(args[0])
+    script, backend, direct_backend = create_script(options.tracks)
+    replayed_events, busy_seconds = replay(script, events, options.speed)
+    script.disconnect()
+    captured_out = len([ event for event in events if event[1] == CAPTURE_DIRECTION_OUT ])
+    captured_out_direct = len([ event for event in events if event[1] == CAPTURE_DIRECTION_OUT_DIRECT ])
+    print 'capture from %s, %.1f s' % (time.ctime(start_time), events[-1][0] if events else 0.0)
+    print 'replayed %d events in %.3f s script time' % (replayed_events, busy_seconds)
+    print 'sent %d messages (captured %d), %d direct (captured %d)' % (len(backend.messages),
+     captured_out, len(direct_backend.messages), captured_out_direct)
+
+
+if __name__ == '__main__':
+    main()
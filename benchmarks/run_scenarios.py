@@ -0,0 +1,216 @@
+"""Scenario benchmarks of the whole script, driven through the fake Live objects
+of fake_live: startup, bank paging across 8/64/512/2000 tracks, fader sweeps,
+renames, exclusive solo storms, blinking clip stop LEDs and idle ticks.
+
+For every scenario the time per operation (best of NUM_REPEATS runs) and the
+MIDI messages and bytes the script sent per operation are reported, next to the
+values of the baseline file. The byte counts don't depend on the machine, so a
+change there is a behaviour change; the times only compare on the same machine.
+Run it with the Python 2.7 interpreter Live uses:
+
+    python benchmarks/run_scenarios.py          # compare with benchmarks/baseline.txt
+    python benchmarks/run_scenarios.py --save   # write a new baseline
+"""
+import optparse
+import os
+from timeit import default_timer
+
+import fake_live
+fake_live.install()
+
+from consts import *
+from ZeRO_SLMkII import ZeRO_SLMkII
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.txt')
+TRACK_COUNTS = (8, 64, 512, 2000)
+NUM_REPEATS = 3
+CC = CC_STATUS + SL_MIDI_CHANNEL
+
+
+class CountingMidiBackend():
+    """Counts the sent messages and bytes"""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    def send(self, midi_bytes):
+        self.messages += 1
+        self.bytes += len(midi_bytes)
+
+    def close(self):
+        pass
+
+    def counters(self):
+        return {}
+
+
+class Bench():
+    """A fake song, and the script once start() was called"""
+
+    def __init__(self, num_tracks, num_clips = 0):
+        self.song = fake_live.Song(num_tracks, 2, 8, num_clips)
+        self.c_instance = fake_live.CInstance(self.song)
+        self.backend = CountingMidiBackend()
+        self.direct_backend = CountingMidiBackend()
+        self.script = None
+
+    def start(self):
+        """Loads the script the way Live does, and ticks until the hardware update is done"""
+        self.script = ZeRO_SLMkII(self.c_instance)
+        self.script.transport().set_backend(self.backend)
+        self.script.transport().set_direct_backend(self.direct_backend)
+        self.script.build_midi_map(0)
+        self.script.refresh_state()
+        self.ticks(6)
+        return self
+
+    def ticks(self, num_ticks):
+        for tick in range(num_ticks):
+            self.script.update_display()
+
+    def press(self, cc_no):
+        self.script.receive_midi((CC, cc_no, CC_VAL_BUTTON_PRESSED))
+        self.script.receive_midi((CC, cc_no, CC_VAL_BUTTON_RELEASED))
+
+    def sent(self):
+        return (self.backend.messages + self.direct_backend.messages, self.backend.bytes + self.direct_backend.bytes)
+
+
+def startup(bench):
+    bench.start()
+    return 1
+
+
+def paging(bench):
+    num_pages = max(1, (len(bench.song.visible_tracks) + len(bench.song.return_tracks)) // NUM_CONTROLS_PER_ROW)
+    for page in range(num_pages):
+        bench.press(MX_DISPLAY_PAGE_UP)
+        bench.ticks(1)
+    for page in range(num_pages):
+        bench.press(MX_DISPLAY_PAGE_DOWN)
+        bench.ticks(1)
+    return 2 * num_pages
+
+
+def fader_sweep(bench):
+    """Live moves the mapped volumes, the script shows the values"""
+    tracks = bench.song.visible_tracks[:NUM_CONTROLS_PER_ROW]
+    for step in range(128):
+        for track in tracks:
+            track.mixer_device.volume.value = step / 127.0
+        bench.ticks(1)
+    return 128 * len(tracks)
+
+
+def renames(bench):
+    tracks = bench.song.visible_tracks[:NUM_CONTROLS_PER_ROW]
+    for index in range(256):
+        tracks[index % len(tracks)].name = 'Renamed %d' % index
+        if index % NUM_CONTROLS_PER_ROW == NUM_CONTROLS_PER_ROW - 1:
+            bench.ticks(1)
+    return 256
+
+
+def solo_storm(bench):
+    for index in range(256):
+        bench.press(fx_upper_button_row_ccs[index % NUM_CONTROLS_PER_ROW])
+        if index % NUM_CONTROLS_PER_ROW == NUM_CONTROLS_PER_ROW - 1:
+            bench.ticks(1)
+    return 256
+
+
+def clip_stop_ticks(bench):
+    """All strips blink their stop buttons for 100 ticks"""
+    tracks = bench.song.visible_tracks[:NUM_CONTROLS_PER_ROW]
+    for track in tracks:
+        track.fire_clip(0)
+    bench.press(fx_lower_button_row_ccs[NUM_CONTROLS_PER_ROW - 1])
+    for track in tracks:
+        track.stop_all_clips()
+    bench.ticks(100)
+    for track in tracks:
+        track.clips_stopped()
+    bench.ticks(1)
+    return 101
+
+
+def idle_ticks(bench):
+    bench.ticks(1000)
+    return 1000
+
+
+def scenarios():
+    """(name, create bench, run) of all scenarios"""
+    ret = []
+    for num_tracks in TRACK_COUNTS:
+        ret.append(('startup %d tracks' % num_tracks, lambda num_tracks = num_tracks: Bench(num_tracks), startup))
+    for num_tracks in TRACK_COUNTS:
+        ret.append(('paging %d tracks' % num_tracks, lambda num_tracks = num_tracks: Bench(num_tracks).start(), paging))
+    ret.append(('fader sweep', lambda : Bench(64).start(), fader_sweep))
+    ret.append(('renames', lambda : Bench(64).start(), renames))
+    ret.append(('exclusive solo storm', lambda : Bench(64).start(), solo_storm))
+    ret.append(('clip stop ticks', lambda : Bench(64, 1).start(), clip_stop_ticks))
+    ret.append(('idle ticks', lambda : Bench(64).start(), idle_ticks))
+    return ret
+
+
+def measure(create_bench, run):
+    """Returns (operations, best seconds, messages, bytes) of the scenario"""
+    best_seconds = None
+    for repeat in range(NUM_REPEATS):
+        bench = create_bench()
+        messages, num_bytes = bench.sent()
+        start = default_timer()
+        operations = run(bench)
+        seconds = default_timer() - start
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+        messages = bench.sent()[0] - messages
+        num_bytes = bench.sent()[1] - num_bytes
+    return operations, best_seconds, messages, num_bytes
+
+
+def read_baseline(file_name):
+    """Returns {scenario name: (us/op, messages/op, bytes/op)}"""
+    baseline = {}
+    if os.path.exists(file_name):
+        for line in open(file_name):
+            if line.strip() and not line.startswith('#'):
+                name, us_per_op, messages_per_op, bytes_per_op = line.rstrip('\n').split('\t')
+                baseline[name] = (float(us_per_op), float(messages_per_op), float(bytes_per_op))
+    return baseline
+
+
+def write_baseline(file_name, results):
+    baseline = open(file_name, 'w')
+    baseline.write('# scenario\tus/op\tmessages/op\tbytes/op (written by run_scenarios.py --save)\n')
+    for name, us_per_op, messages_per_op, bytes_per_op in results:
+        baseline.write('%s\t%.2f\t%.2f\t%.2f\n' % (name, us_per_op, messages_per_op, bytes_per_op))
+    baseline.close()
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--save', action='store_true', default=False, help='write the results as the new baseline')
+    parser.add_option('--baseline', default=BASELINE_FILE, help='baseline file')
+    options, args = parser.parse_args()
+    baseline = read_baseline(options.baseline)
+    results = []
+    print '%-24s %10s %10s %8s %8s %9s %9s' % ('scenario', 'us/op', 'base', 'msg/op', 'base', 'B/op', 'base')
+    for name, create_bench, run in scenarios():
+        operations, seconds, messages, num_bytes = measure(create_bench, run)
+        result = (name, seconds / operations * 1000000.0, float(messages) / operations, float(num_bytes) / operations)
+        results.append(result)
+        base = baseline.get(name)
+        if base:
+            print '%-24s %10.2f %10.2f %8.2f %8.2f %9.2f %9.2f' % (name, result[1], base[0], result[2], base[1], result[3], base[2])
+        else:
+            print '%-24s %10.2f %10s %8.2f %8s %9.2f %9s' % (name, result[1], '-', result[2], '-', result[3], '-')
+    if options.save:
+        write_baseline(options.baseline, results)
+        print 'baseline written to %s' % options.baseline
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Tests of the TickScheduler. Run them with the Python 2.7 interpreter Live uses:
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'ZeRO_SLMkII'))
+
+from consts import *
+from Logger import Logger
+from TickScheduler import TickScheduler
+
+
+class TickSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log_messages = []
+        self.scheduler = TickScheduler(Logger(self.log_messages.append), 8)
+        self.calls = []
+
+    def ticks(self, num_ticks):
+        for tick in range(num_ticks):
+            self.scheduler.tick()
+
+    def test_repeating_task(self):
+        self.scheduler.schedule_repeating(3, lambda : self.calls.append('a'), 'a')
+        self.ticks(12)
+        self.assertEqual(self.calls, ['a'] * 4)
+
+    def test_task_due_after_a_turn_of_the_wheel(self):
+        self.scheduler.schedule(20, lambda : self.calls.append(self.scheduler.current_tick()), 'late')
+        self.ticks(30)
+        self.assertEqual(self.calls, [20])
+
+    def test_cancelled_task_does_not_run(self):
+        task = self.scheduler.schedule(2, lambda : self.calls.append('a'), 'a')
+        self.scheduler.cancel(task)
+        self.ticks(4)
+        self.assertEqual(self.calls, [])
+
+    def test_raising_task_does_not_block_its_slot(self):
+
+        def fail():
+            raise ValueError('failed')
+
+        self.scheduler.schedule_repeating(1, lambda : self.calls.append('a'), 'a')
+        self.scheduler.schedule_repeating(1, fail, 'fail')
+        self.scheduler.schedule_repeating(1, lambda : self.calls.append('c'), 'c')
+        self.ticks(12)
+        self.assertEqual(self.calls.count('a'), 12)
+        self.assertEqual(self.calls.count('c'), 12)
+        self.assertEqual(self.scheduler.costs()['fail'][0], 12)
+        self.assertTrue(self.log_messages)
+        self.assertTrue('task fail failed' in self.log_messages[0])
+        self.assertTrue('ValueError' in self.log_messages[0])
+
+
+if __name__ == '__main__':
+    unittest.main()